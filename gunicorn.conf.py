@@ -0,0 +1,18 @@
+import multiprocessing
+import os
+
+
+# gunicorn config.wsgi picks this file up automatically.
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+
+# Import Django and the app once in the master; workers fork from it.
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before workers spawn
+    from profiles.startup import warm_up
+
+    warm_up()
@@ -1,11 +1,15 @@
-from django.contrib import admin
-from .models import Customer, Order, Payment, CreditProfile, ActivityLog
+from django.contrib import admin, messages
+from django.db.models import F
+from .models import Customer, Order, Payment, CreditProfile, CreditScoreHistory, CustomerDailyActivity, CustomerChange, SyncWatermark, Scorecard, ActivityLog
+from .services.rescoring import rescore_from_features
+from .services.scorecards import activate_scorecard
 
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
-    list_display = ("full_name", "email", "phone", "created_at")
-    search_fields = ("full_name", "email", "phone")
+    list_display = ("full_name", "email", "phone", "user", "created_at")
+    search_fields = ("full_name", "email", "phone", "user__username")
+    raw_id_fields = ("user",)
 
 
 @admin.register(Order)
@@ -24,9 +28,76 @@ class PaymentAdmin(admin.ModelAdmin):
 
 @admin.register(CreditProfile)
 class CreditProfileAdmin(admin.ModelAdmin):
-    list_display = ("customer", "score", "risk_band", "updated_at")
+    list_display = ("customer", "score", "risk_band", "scorecard_version", "updated_at")
+    list_filter = ("risk_band", "scorecard_version")
+    search_fields = ("customer__full_name", "customer__email")
+    readonly_fields = ("version",)
+    actions = ["rescore_from_features"]
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Scoring writes compare-and-swap on version: bump it rather than
+            # writing back the version loaded with the form
+            obj.version = F("version") + 1
+        super().save_model(request, obj, form, change)
+        if change:
+            obj.refresh_from_db(fields=["version"])
+
+    @admin.action(description="Rescore selected profiles from stored features (active scorecard)")
+    def rescore_from_features(self, request, queryset):
+        stats = rescore_from_features(queryset, request=request)
+        message = f"Rescored {stats['scanned']} profiles: {stats['changed']} updated, {stats['band_changes']} band changes."
+        if stats["missing_features"]:
+            message += f" {stats['missing_features']} lack features the scorecard uses and were skipped; recompute them."
+        self.message_user(request, message, messages.WARNING if stats["missing_features"] else messages.SUCCESS)
+
+
+@admin.register(Scorecard)
+class ScorecardAdmin(admin.ModelAdmin):
+    list_display = ("version", "name", "is_active", "created_at")
+    readonly_fields = ("is_active", "created_at")
+    actions = ["activate"]
+
+    def get_readonly_fields(self, request, obj=None):
+        # Profiles record the version they were scored with, so a saved definition is frozen
+        if obj is not None:
+            return self.readonly_fields + ("version", "definition")
+        return self.readonly_fields
+
+    @admin.action(description="Activate selected scorecard")
+    def activate(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Select exactly one scorecard to activate.", messages.ERROR)
+            return
+        scorecard = activate_scorecard(queryset.get().version)
+        self.message_user(request, f"{scorecard} is now used for new scores.", messages.SUCCESS)
+
+
+@admin.register(CreditScoreHistory)
+class CreditScoreHistoryAdmin(admin.ModelAdmin):
+    list_display = ("customer", "score", "risk_band", "created_at")
     list_filter = ("risk_band",)
     search_fields = ("customer__full_name", "customer__email")
+    date_hierarchy = "created_at"
+
+
+@admin.register(CustomerDailyActivity)
+class CustomerDailyActivityAdmin(admin.ModelAdmin):
+    list_display = ("customer", "day", "orders", "spend", "delivered_orders", "returned_orders", "payments_succeeded", "payments_failed", "cod_payments")
+    search_fields = ("customer__full_name", "customer__email")
+    date_hierarchy = "day"
+
+
+@admin.register(CustomerChange)
+class CustomerChangeAdmin(admin.ModelAdmin):
+    list_display = ("id", "customer_id", "source", "created_at")
+    list_filter = ("source",)
+    search_fields = ("customer_id",)
+
+
+@admin.register(SyncWatermark)
+class SyncWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "position", "updated_at")
 
 
 @admin.register(ActivityLog)
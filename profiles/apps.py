@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProfilesConfig(AppConfig):
@@ -9,36 +10,7 @@ class ProfilesConfig(AppConfig):
     def ready(self):
         from . import signals  # noqa: F401
         from . import social_signals  # noqa: F401
-        # Auto-configure Google SocialApp if env vars are present
-        import os
-        try:
-            from allauth.socialaccount.models import SocialApp
-            from django.contrib.sites.models import Site
-        except Exception:
-            return
-        client_id = os.environ.get("GOOGLE_CLIENT_ID")
-        secret = os.environ.get("GOOGLE_CLIENT_SECRET")
-        if client_id and secret:
-            try:
-                site = Site.objects.get_current()
-                app, _ = SocialApp.objects.get_or_create(
-                    provider="google",
-                    defaults={"name": "Google", "client_id": client_id, "secret": secret},
-                )
-                # Update if changed
-                changed = False
-                if app.client_id != client_id:
-                    app.client_id = client_id
-                    changed = True
-                if app.secret != secret:
-                    app.secret = secret
-                    changed = True
-                if changed:
-                    app.save()
-                if site not in app.sites.all():
-                    app.sites.add(site)
-            except Exception:
-                # Avoid blocking startup if Sites not migrated yet
-                pass
-
-
+        # No database access here: ready() runs in every worker and every
+        # management command. The SocialApp sync runs after migrate instead.
+        from .services.oauth_config import sync_after_migrate
+        post_migrate.connect(sync_after_migrate, sender=self)
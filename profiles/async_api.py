@@ -0,0 +1,72 @@
+"""Async handlers for DRF viewsets.
+
+DRF runs every view synchronously, which under ASGI means a worker thread
+per request. :class:`AsyncActionsMixin` lets individual actions be written
+as ``async def`` using Django's async ORM: authentication, permissions and
+throttling still run DRF's sync code (in a thread), then the handler runs
+on the event loop. Routes whose methods are all sync are untouched, so
+writes and their signal handlers keep their existing sync path.
+"""
+import functools
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import Http404
+
+
+class AsyncActionsMixin:
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        async_methods = {
+            method for method, name in (actions or {}).items() if iscoroutinefunction(getattr(cls, name, None))
+        }
+        if not async_methods:
+            return view
+        if len(async_methods) != len(actions):
+            raise ImproperlyConfigured(
+                f"{cls.__name__}: actions sharing a route must be all sync or all async ({actions})"
+            )
+
+        async def async_view(request, *args, **kwargs):
+            method = "get" if request.method == "HEAD" else request.method.lower()
+            if method in async_methods:
+                return await view(request, *args, **kwargs)
+            # OPTIONS, 405s
+            return await sync_to_async(view)(request, *args, **kwargs)
+
+        functools.update_wrapper(async_view, view)
+        return async_view
+
+    def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if iscoroutinefunction(handler):
+            return self._adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        # APIView.dispatch with the handler awaited
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower())
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """``get_object`` with the row fetched through the async ORM."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, ValueError, TypeError, ValidationError):
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,78 @@
+import hashlib
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .routing import pinned_to_primary
+from .services.metrics import increment
+
+
+_VERSION_KEY = "api-version:{}"
+
+
+def _version_key(model) -> str:
+    return _VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_versions(models: Iterable) -> List[int]:
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, 1, timeout=None)
+            found[key] = cache.get(key, 1)
+        versions.append(found[key])
+    return versions
+
+
+def bump_version(model) -> None:
+    """Invalidate every cached list that depends on ``model``."""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+        cache.incr(key)
+
+
+class CachedListMixin:
+    """Cache serialized ``list`` responses until one of ``cache_models`` changes.
+
+    Entries are keyed on the current version of every model in
+    ``cache_models``, the normalized query parameters and whether the caller
+    is staff, so a save of any of those models makes older entries
+    unreachable instead of waiting on a TTL.
+
+    A replica may not have caught up with the write that bumped a version,
+    so lists served from replicas (``ReplicaListMixin`` with replicas
+    configured) bypass the cache, as do requests pinned to the primary
+    after a write.
+    """
+
+    cache_models = ()
+
+    def _list_cache_key(self, request) -> str:
+        params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+        role = "staff" if request.user.is_staff else "user"
+        versions = get_versions(self.cache_models)
+        # next/previous links are absolute, so the host is part of the response
+        raw = repr((self.basename, role, request.get_host(), versions, params))
+        return "api-list:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        if pinned_to_primary() or (getattr(self, "lists_from_replica", False) and settings.DATABASE_REPLICAS):
+            return super().list(request, *args, **kwargs)
+        key = self._list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            from rest_framework.response import Response
+
+            increment("api_cache.hits")
+            return Response(data)
+        increment("api_cache.misses")
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_LIST_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,53 @@
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import CreditProfile
+
+
+async def aget_profile_state(**lookup) -> Optional[Tuple[int, datetime]]:
+    """Return (id, updated_at) of the matching profile from one indexed query."""
+    try:
+        return await CreditProfile.objects.filter(**lookup).values_list("id", "updated_at").afirst()
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def profile_etag(request, profile_id: int, updated_at: datetime) -> str:
+    # The negotiated format and query parameters change the representation,
+    # so they are part of the (strong) tag
+    renderer = getattr(request, "accepted_renderer", None)
+    token = f"cp{profile_id}-{int(updated_at.timestamp() * 1_000_000)}-{getattr(renderer, 'format', 'json')}"
+    query = request.GET.urlencode()
+    if query:
+        token += "-" + hashlib.md5(query.encode("utf-8")).hexdigest()[:12]
+    return quote_etag(token)
+
+
+def is_not_modified(request, etag: str, updated_at: datetime) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        tags = parse_etags(if_none_match)
+        return "*" in tags or etag in tags
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE"))
+    if if_modified_since is not None:
+        return int(updated_at.timestamp()) <= if_modified_since
+    return False
+
+
+def set_validators(response: Response, etag: str, updated_at: datetime) -> Response:
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(updated_at.timestamp())
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def not_modified_response(etag: str, updated_at: datetime) -> Response:
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, updated_at)
@@ -0,0 +1,61 @@
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from .services.metrics import increment
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    message = str(exc).lower()
+    return isinstance(exc, OperationalError) and ("database is locked" in message or "database is busy" in message)
+
+
+def atomic_with_retry(func=None, *, using: str = DEFAULT_DB_ALIAS):
+    """Run ``func`` in a transaction, retrying it when SQLite reports lock contention.
+
+    Retries are bounded by ``DATABASE_LOCK_RETRIES`` and spaced with full
+    jitter (a random wait up to ``DATABASE_LOCK_RETRY_BASE_MS * 2**attempt``)
+    so competing workers don't retry in lockstep. When called inside an
+    outer transaction the whole outer block would have to be replayed, so
+    the error is raised instead.
+    """
+    if func is None:
+        return functools.partial(atomic_with_retry, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        retry = not connections[using].in_atomic_block
+        attempt = 0
+        while True:
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not retry or not is_lock_error(exc) or attempt >= settings.DATABASE_LOCK_RETRIES:
+                    raise
+                delay = random.uniform(0, settings.DATABASE_LOCK_RETRY_BASE_MS * 2 ** attempt) / 1000
+                attempt += 1
+                increment("db.lock_retries")
+                logger.warning("Database locked in %s, retry %d in %.0f ms", func.__qualname__, attempt, delay * 1000)
+                time.sleep(delay)
+    return wrapper
+
+
+class RetryWritesMixin:
+    """Run a viewset's create/update/destroy, including signal handlers, as one retried transaction."""
+
+    def perform_create(self, serializer):
+        atomic_with_retry(super().perform_create)(serializer)
+
+    def perform_update(self, serializer):
+        atomic_with_retry(super().perform_update)(serializer)
+
+    def perform_destroy(self, instance):
+        atomic_with_retry(super().perform_destroy)(instance)
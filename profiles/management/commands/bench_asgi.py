@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+
+from profiles.models import CreditProfile, Customer
+
+
+ENDPOINTS = ("profile", "lookup", "dashboard", "audit")
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent read throughput of the WSGI and ASGI request handlers in-process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once (default: 16)")
+        parser.add_argument("--requests", type=int, default=400, help="Requests per endpoint and handler (default: 400)")
+        parser.add_argument(
+            "--endpoint", action="append", choices=ENDPOINTS, help="Endpoint to benchmark; repeat for several (default: all)"
+        )
+        parser.add_argument("--lookup-size", type=int, default=50, help="Customers per lookup request (default: 50)")
+
+    def _requests(self, endpoints, lookup_size):
+        """(name, method, path, json body, use the customer's session) per endpoint."""
+        rows = list(CreditProfile.objects.values_list("pk", "customer_id")[:lookup_size])
+        if not rows:
+            raise CommandError("No credit profiles to read; run seed_sample_data first")
+        customer_ids = [str(customer_id) for _, customer_id in rows]
+        plans = {
+            "profile": ("get", f"/api/credit-profiles/{rows[0][0]}/", None, False),
+            "lookup": ("post", "/api/credit-profiles/lookup/", {"customers": customer_ids}, False),
+            "dashboard": ("get", "/my-dashboard/", None, True),
+            "audit": ("get", "/audit-logs/", None, False),
+        }
+        return [(name, *plans[name]) for name in endpoints]
+
+    def _wsgi(self, plan, cookies, concurrency, total):
+        method, path, body, as_customer = plan
+        local = threading.local()
+
+        def one(_):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client()
+                client.cookies = cookies[as_customer]
+            started = time.perf_counter()
+            response = getattr(client, method)(path, body, content_type="application/json") if body else getattr(client, method)(path)
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # Worker threads keep their own connections open; close them before the threads exit
+            results = list(pool.map(one, range(total)))
+            list(pool.map(lambda _: connections.close_all(), range(concurrency)))
+        return results, time.perf_counter() - started
+
+    def _asgi(self, plan, cookies, concurrency, total):
+        method, path, body, as_customer = plan
+
+        async def run():
+            client = AsyncClient()
+            client.cookies = cookies[as_customer]
+            gate = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with gate:
+                    started = time.perf_counter()
+                    call = getattr(client, method)
+                    response = await (call(path, body, content_type="application/json") if body else call(path))
+                    return response.status_code, time.perf_counter() - started
+
+            return await asyncio.gather(*(one() for _ in range(total)))
+
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        return results, time.perf_counter() - started
+
+    def _report(self, label, results, elapsed):
+        latencies = sorted(latency for _, latency in results)
+        errors = sum(1 for status, _ in results if status != 200)
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        line = f"  {label:<5} {len(results) / elapsed:8.1f} req/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms"
+        if errors:
+            self.stdout.write(self.style.ERROR(f"{line}   {errors} non-200 responses"))
+        else:
+            self.stdout.write(line)
+        return len(results) / elapsed
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        total = max(1, options["requests"])
+        endpoints = options["endpoint"] or ENDPOINTS
+        plans = self._requests(dict.fromkeys(endpoints), max(1, options["lookup_size"]))
+
+        # Throwaway staff user and customer-linked user, removed with their sessions afterwards
+        run_id = uuid.uuid4().hex[:8]
+        User = get_user_model()
+        staff = User.objects.create_user(username=f"bench-{run_id}", is_staff=True)
+        member = User.objects.create_user(username=f"bench-{run_id}-customer", email=f"bench-{run_id}@example.invalid")
+        customer = Customer.objects.create(user=member, full_name=f"Bench {run_id}", email=member.email)
+        cookies, logins = {}, []
+        for as_customer, user in ((False, staff), (True, member)):
+            client = Client()
+            client.force_login(user)
+            cookies[as_customer] = client.cookies
+            logins.append(client)
+        connections.close_all()
+
+        try:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{total} requests per run, {concurrency} in flight"))
+            for name, *plan in plans:
+                self.stdout.write(name)
+                wsgi = self._report("wsgi", *self._wsgi(plan, cookies, concurrency, total))
+                asgi = self._report("asgi", *self._asgi(plan, cookies, concurrency, total))
+                self.stdout.write(f"  asgi/wsgi throughput x{asgi / wsgi:.2f}")
+        finally:
+            connections.close_all()
+            for client in logins:
+                client.logout()
+            customer.delete()
+            User.objects.filter(pk__in=[staff.pk, member.pk]).delete()
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = "Compare per-request connection cost with a fresh connection per request vs the configured settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Simulated requests per mode (default: 200)")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to benchmark")
+
+    def _run(self, connection, requests: int) -> float:
+        """Average ms per simulated request: open/reuse the connection, run one query, finish."""
+        started = time.perf_counter()
+        for _ in range(requests):
+            # The same signals Django's handler sends; close_old_connections()
+            # decides from CONN_MAX_AGE whether the connection survives.
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+        return (time.perf_counter() - started) / requests * 1000.0
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        requests = max(1, options["requests"])
+        settings_dict = connection.settings_dict
+        configured_age = settings_dict["CONN_MAX_AGE"]
+        pooled = bool(settings_dict.get("OPTIONS", {}).get("pool"))
+
+        connection.close()
+        settings_dict["CONN_MAX_AGE"] = 0
+        original_options = settings_dict.get("OPTIONS", {})
+        if pooled:
+            settings_dict["OPTIONS"] = {key: value for key, value in original_options.items() if key != "pool"}
+        try:
+            fresh = self._run(connection, requests)
+        finally:
+            connection.close()
+            settings_dict["CONN_MAX_AGE"] = configured_age
+            settings_dict["OPTIONS"] = original_options
+        configured = self._run(connection, requests)
+        connection.close()
+
+        mode = "pool" if pooled else f"CONN_MAX_AGE={configured_age}"
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{connection.vendor} '{connection.alias}', {requests} requests"))
+        self.stdout.write(f"  new connection per request  {fresh:8.3f} ms/request")
+        self.stdout.write(f"  configured ({mode:<14})  {configured:8.3f} ms/request")
+        if configured:
+            self.stdout.write(f"  saved per request           {fresh - configured:8.3f} ms (x{fresh / configured:.1f})")
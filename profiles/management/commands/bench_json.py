@@ -0,0 +1,72 @@
+import time
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from profiles.renderers import FastJSONParser, FastJSONRenderer, orjson
+from profiles.views import CreditProfileViewSet, OrderViewSet
+
+
+ENDPOINTS = [
+    ("/api/orders/", OrderViewSet),
+    ("/api/credit-profiles/", CreditProfileViewSet),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the stdlib vs fast JSON renderer/parser on real API list pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="Renders per endpoint and renderer (default: 200)")
+        parser.add_argument("--page-size", type=int, default=100, help="Rows per page to render (default: 100)")
+
+    def _time(self, func, iterations: int) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - started) / iterations * 1000.0
+
+    def handle(self, *args, **options):
+        iterations = max(1, options["iterations"])
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: the fast renderer will use the stdlib path"))
+
+        factory = APIRequestFactory()
+        user = User(username="bench", is_staff=True, is_active=True)
+        stock_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), FastJSONParser()
+
+        for url, viewset in ENDPOINTS:
+            view = viewset.as_view({"get": "list"})
+            pagination_class = viewset.pagination_class
+            default_page_size = pagination_class.page_size
+            pagination_class.page_size = options["page_size"]
+            try:
+                request = factory.get(url)
+                force_authenticate(request, user=user)
+                data = view(request).data
+            finally:
+                pagination_class.page_size = default_page_size
+            rows = len(data.get("results", []))
+
+            stock_bytes = stock_renderer.render(data)
+            fast_bytes = fast_renderer.render(data)
+            identical = stock_bytes == fast_bytes
+
+            render_stock = self._time(lambda: stock_renderer.render(data), iterations)
+            render_fast = self._time(lambda: fast_renderer.render(data), iterations)
+            parse_stock = self._time(lambda: stock_parser.parse(BytesIO(stock_bytes)), iterations)
+            parse_fast = self._time(lambda: fast_parser.parse(BytesIO(stock_bytes)), iterations)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{url} ({rows} rows, {len(stock_bytes)} bytes)"))
+            self.stdout.write(f"  render  stdlib {render_stock:8.3f} ms   fast {render_fast:8.3f} ms   x{render_stock / render_fast:5.1f}")
+            self.stdout.write(f"  parse   stdlib {parse_stock:8.3f} ms   fast {parse_fast:8.3f} ms   x{parse_stock / parse_fast:5.1f}")
+            if identical:
+                self.stdout.write(self.style.SUCCESS("  output identical"))
+            else:
+                same_values = stock_parser.parse(BytesIO(stock_bytes)) == stock_parser.parse(BytesIO(fast_bytes))
+                self.stdout.write(self.style.WARNING(f"  output differs in spelling; parsed values equal: {same_values}"))
@@ -0,0 +1,57 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from profiles.models import Customer
+from profiles.query_plans import HOT_QUERIES
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every registered hot query and fail if one no longer uses its intended index"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plan of every query")
+
+    def _explain(self, queryset) -> str:
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+        # Tiny test tables make Postgres prefer sequential scans; rule them
+        # out so the check asks "can this index serve the query?"
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+
+    def _index_names(self, query, queryset):
+        names = [query.index]
+        meta = queryset.model._meta
+        if connection.vendor == "sqlite" and any(
+            isinstance(constraint, models.UniqueConstraint) and constraint.name == query.index
+            for constraint in meta.constraints
+        ):
+            # SQLite creates unique constraints inline and names their index itself
+            names.append(f"sqlite_autoindex_{meta.db_table}_")
+        return names
+
+    def handle(self, *args, **options):
+        customer_id = Customer.objects.values_list("pk", flat=True).first() or uuid.uuid4()
+        failures = []
+        for query in HOT_QUERIES:
+            queryset = query.build(customer_id)
+            plan = self._explain(queryset)
+            names = self._index_names(query, queryset)
+            lines = [line for line in plan.splitlines() if any(name in line for name in names)]
+            # On SQLite "SCAN ... USING INDEX" walks the whole index; only a SEARCH seeks it
+            ok = bool(lines) and (connection.vendor != "sqlite" or any("SEARCH" in line for line in lines))
+            status = self.style.SUCCESS("ok  ") if ok else self.style.ERROR("FAIL")
+            self.stdout.write(f"{status} {query.name:<34} {query.index}")
+            if options["verbose_plans"] or not ok:
+                for line in plan.splitlines():
+                    self.stdout.write(f"       {line}")
+            if not ok:
+                failures.append(query.name)
+        if failures:
+            raise CommandError(f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} no longer use their index: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"All {len(HOT_QUERIES)} hot queries use their intended index"))
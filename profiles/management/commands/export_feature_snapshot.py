@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.services.feature_snapshot import SnapshotError, export_snapshot, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write every credit profile's ids, score, band and features as memory-mappable NumPy columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=settings.FEATURE_SNAPSHOT_DIR, help="Snapshot directory (default: FEATURE_SNAPSHOT_DIR)")
+        parser.add_argument("--full", action="store_true", help="Re-read every profile instead of only those changed since the last export")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Profiles read per query (default: 5000)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        export = export_snapshot if options["full"] else refresh_snapshot
+        try:
+            stats = export(options["path"], chunk_size=max(1, options["chunk_size"]))
+        except SnapshotError as exc:
+            raise CommandError(str(exc))
+        mode = "Full export" if stats["full"] else "Refresh"
+        self.stdout.write(self.style.SUCCESS(
+            f"{mode}: {stats['rows']} profiles in generation {stats['generation']} at {options['path']} "
+            f"({stats['read']} read from the database, {stats['copied']} carried over, {stats['removed']} removed) "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
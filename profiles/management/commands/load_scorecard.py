@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from profiles.models import Scorecard
+from profiles.services.scorecards import ScorecardError, activate_scorecard, validate_definition
+
+
+class Command(BaseCommand):
+    help = "Store a scorecard definition (JSON or YAML file) as a new version"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Definition file, .json or .yaml/.yml")
+        parser.add_argument("--as-version", type=int, dest="scorecard_version", help="Version number (default: next free one)")
+        parser.add_argument("--name", default="", help="Short description shown in the admin")
+        parser.add_argument("--activate", action="store_true", help="Use it for new scores right away")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        if path.suffix.lower() in (".yaml", ".yml"):
+            import yaml
+
+            definition = yaml.safe_load(text)
+        else:
+            definition = json.loads(text)
+        try:
+            validate_definition(definition)
+        except ScorecardError as exc:
+            raise CommandError(f"Invalid scorecard: {exc}")
+
+        version = options["scorecard_version"] or (Scorecard.objects.aggregate(v=Max("version"))["v"] or 0) + 1
+        if Scorecard.objects.filter(version=version).exists():
+            raise CommandError(f"Scorecard v{version} already exists; versions are immutable, pick a new one")
+        scorecard = Scorecard.objects.create(version=version, name=options["name"], definition=definition)
+        self.stdout.write(self.style.SUCCESS(f"Stored {scorecard}"))
+        if options["activate"]:
+            activate_scorecard(version)
+            self.stdout.write(self.style.SUCCESS(f"Scorecard v{version} is now active; existing profiles keep their scores until recomputed"))
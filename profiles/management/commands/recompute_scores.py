@@ -1,17 +1,82 @@
-from django.core.management.base import BaseCommand
+import time
 
-from ....profiles.models import Customer
-from ....profiles.services.credit_scoring import compute_and_persist_credit_profile
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.models import Customer
+from profiles.services.change_tracking import advance_watermark, latest_position, process_changes
+from profiles.services.credit_scoring import compute_and_persist_credit_profile
+from profiles.services.rescoring import rescore_from_features
+from profiles.services.scorecards import ScorecardError
+
+
+# SyncWatermark consumed by --incremental
+WATERMARK = "recompute_scores"
 
 
 class Command(BaseCommand):
     help = "Recompute credit scores for all customers"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only recompute customers whose orders or payments changed since the last incremental run",
+        )
+        parser.add_argument(
+            "--from-features",
+            action="store_true",
+            help="Re-apply the scorecard to stored profile features instead of re-reading orders and payments",
+        )
+        parser.add_argument("--scorecard", type=int, help="With --from-features --dry-run: preview this scorecard version")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Profiles per batch with --from-features (default: 2000)")
+        parser.add_argument("--dry-run", action="store_true", help="With --from-features: report what would change, write nothing")
+
     def handle(self, *args, **options):
+        if options["from_features"] and options["incremental"]:
+            raise CommandError("--incremental and --from-features are separate modes")
+        if options["from_features"]:
+            self._rescore(options)
+            return
+        if options["scorecard"] or options["dry_run"]:
+            raise CommandError("--scorecard and --dry-run only apply with --from-features")
+        if options["incremental"]:
+            self._incremental()
+            return
+        # Changes logged before the scan starts are covered by it
+        position = latest_position()
         total = 0
         for customer in Customer.objects.all().iterator():
             compute_and_persist_credit_profile(customer)
             total += 1
+        advance_watermark(WATERMARK, position)
         self.stdout.write(self.style.SUCCESS(f"Recomputed credit scores for {total} customers"))
 
+    def _incremental(self):
+        started = time.perf_counter()
+        stats = process_changes(WATERMARK, compute_and_persist_credit_profile)
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed credit scores for {stats['customers']} changed customers "
+            f"({stats['changes']} change records, {stats['missing']} deleted customers skipped) "
+            f"in {time.perf_counter() - started:.2f}s; watermark at {stats['position']}"
+        ))
 
+    def _rescore(self, options):
+        started = time.perf_counter()
+        try:
+            stats = rescore_from_features(
+                version=options["scorecard"], chunk_size=max(1, options["chunk_size"]), dry_run=options["dry_run"]
+            )
+        except ScorecardError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+        verb = "Would update" if options["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {stats['scanned']} profiles from stored features in {elapsed:.2f}s; "
+            f"{verb} {stats['changed']} ({stats['band_changes']} band changes, {stats['version_only']} version only)"
+        ))
+        if stats["conflicts"]:
+            self.stdout.write(f"{stats['conflicts']} profiles were rescored concurrently while this ran and kept that newer score")
+        if stats["missing_features"]:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['missing_features']} profiles lack features this scorecard uses; run recompute_scores without --from-features to refresh them"
+            ))
@@ -1,9 +1,10 @@
 import random
-from datetime import datetime, timedelta
+from datetime import timedelta
 from decimal import Decimal
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.utils import timezone
 
 from profiles.models import Customer, Order, Payment
 from profiles.services.credit_scoring import compute_and_persist_credit_profile
@@ -36,7 +37,7 @@ class Command(BaseCommand):
         except Customer.DoesNotExist as exc:
             raise CommandError(f"Customer with email '{email}' does not exist. Create it first.") from exc
 
-        now = datetime.now()
+        now = timezone.now()
         self.stdout.write(self.style.MIGRATE_HEADING(
             f"Seeding activity for {customer.full_name} <{customer.email}>: {num_orders} orders, {num_payments} payments"
         ))
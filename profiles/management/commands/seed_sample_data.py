@@ -1,9 +1,10 @@
 import random
-from datetime import datetime, timedelta
+from datetime import timedelta
 from decimal import Decimal
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 
 from profiles.models import Customer, Order, Payment
 from profiles.services.credit_scoring import compute_and_persist_credit_profile
@@ -66,7 +67,7 @@ class Command(BaseCommand):
             created_customers.append(customer)
 
         # For each customer, generate orders and payments
-        now = datetime.now()
+        now = timezone.now()
         total_orders = 0
         total_payments = 0
 
@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter so the numbers match a cold worker start
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+from django.db import connections
+queries = []
+def count(execute, sql, params, many, context):
+    queries.append(sql)
+    return execute(sql, params, many, context)
+wrappers = [connections[alias].execute_wrapper(count) for alias in settings.DATABASES]
+for wrapper in wrappers:
+    wrapper.__enter__()
+django.setup()
+setup_ms = (time.perf_counter() - started) * 1000
+setup_queries = len(queries)
+warm_ms = None
+if "--warm" in sys.argv:
+    from profiles.startup import warm_up
+    warm_started = time.perf_counter()
+    warm_up(freeze=False)
+    warm_ms = (time.perf_counter() - warm_started) * 1000
+json.dump({
+    "setup_ms": setup_ms,
+    "warm_ms": warm_ms,
+    "setup_queries": queries[:setup_queries],
+    "warm_queries": len(queries) - setup_queries,
+    "modules": len(sys.modules),
+    "loaded": sorted(sys.modules),
+}, sys.stdout)
+"""
+
+# Modules that should only load when a request needs them
+DEFERRED = ("xhtml2pdf", "reportlab", "profiles.services.credit_scoring", "rest_framework.response")
+
+
+class Command(BaseCommand):
+    help = "Measure cold Django startup: setup time, slowest imports and database queries"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Slowest imports to list (default: 15)")
+        parser.add_argument("--warm", action="store_true", help="Also time profiles.startup.warm_up()")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"))
+        command = [sys.executable, "-X", "importtime", "-c", PROBE] + (["--warm"] if options["warm"] else [])
+        result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=str(settings.BASE_DIR))
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "startup probe failed")
+        report = json.loads(result.stdout)
+
+        # "import time: <self us> | <cumulative us> | <indent><module>", nesting shown by indent
+        top_level = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            if not name.startswith("  "):
+                top_level.append((int(cumulative_us), name.strip()))
+        top_level.sort(reverse=True)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Startup"))
+        self.stdout.write(f"  django.setup()     {report['setup_ms']:8.1f} ms")
+        if report["warm_ms"] is not None:
+            self.stdout.write(f"  warm_up()          {report['warm_ms']:8.1f} ms ({report['warm_queries']} queries)")
+        self.stdout.write(f"  modules loaded     {report['modules']:8d}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Slowest top-level imports (cumulative)"))
+        for cumulative_us, name in top_level[: options["top"]]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Database queries during setup"))
+        queries = report["setup_queries"]
+        if queries:
+            for sql in queries:
+                self.stdout.write(self.style.WARNING(f"  {sql[:120]}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("  none"))
+
+        loaded = set(report["loaded"])
+        eager = [name for name in DEFERRED if name in loaded]
+        if eager and not options["warm"]:
+            self.stdout.write(self.style.WARNING(f"Loaded at startup but only needed on demand: {', '.join(eager)}"))
@@ -0,0 +1,110 @@
+import multiprocessing
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from profiles.db_retry import atomic_with_retry, is_lock_error
+from profiles.models import Customer, Order
+from profiles.services.metrics import get_counters
+
+
+def _worker(customer_id, seconds: float, retries: bool, results) -> None:
+    # Forked children must not reuse the parent's SQLite handle
+    connections.close_all()
+    if not retries:
+        settings.DATABASE_LOCK_RETRIES = 0
+    retries_before = get_counters()["db.lock_retries"]
+    place_order = atomic_with_retry(Order.objects.create)
+    writes = locked = failed = 0
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            # Same write path as the API: insert plus the scoring/logging signals
+            place_order(
+                customer_id=customer_id,
+                amount=Decimal(random.randint(100, 50000)) / 100,
+                status=random.choice(["placed", "delivered", "returned"]),
+            )
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+            locked += 1
+        except Exception:
+            failed += 1
+        else:
+            writes += 1
+            latencies.append(time.perf_counter() - started)
+    retried = get_counters()["db.lock_retries"] - retries_before
+    results.put({"writes": writes, "locked": locked, "failed": failed, "retries": retried, "latencies": latencies})
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Hammer the database with concurrent order writes from several processes and report writes/second"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4, help="Concurrent writer processes (default: 4)")
+        parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the run (default: 10)")
+        parser.add_argument("--no-retry", action="store_true", help="Disable the lock retry to see raw contention")
+
+    def handle(self, *args, **options):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise CommandError("This command needs the 'fork' start method (Linux/macOS)")
+        processes = max(1, options["processes"])
+
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                pragmas = {}
+                for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size"):
+                    cursor.execute(f"PRAGMA {name}")
+                    pragmas[name] = cursor.fetchone()[0]
+            self.stdout.write("SQLite " + ", ".join(f"{name}={value}" for name, value in pragmas.items()))
+            self.stdout.write(f"transaction_mode={connection.transaction_mode or 'DEFERRED'}")
+
+        # One throwaway customer per process, removed (with its orders and logs) afterwards
+        run_id = uuid.uuid4().hex[:8]
+        customers = [
+            Customer.objects.create(full_name=f"Stress {run_id} #{index}", email=f"stress-{run_id}-{index}@example.invalid")
+            for index in range(processes)
+        ]
+        connections.close_all()
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(customer.pk, options["seconds"], not options["no_retry"], results))
+            for customer in customers
+        ]
+        started = time.perf_counter()
+        try:
+            for process in workers:
+                process.start()
+            reports = [results.get() for _ in workers]
+            for process in workers:
+                process.join()
+        finally:
+            elapsed = time.perf_counter() - started
+            Customer.objects.filter(pk__in=[customer.pk for customer in customers]).delete()
+
+        writes = sum(report["writes"] for report in reports)
+        latencies = sorted(latency for report in reports for latency in report["latencies"])
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{processes} processes, {elapsed:.1f} s"))
+        self.stdout.write(f"  committed writes   {writes}")
+        self.stdout.write(f"  writes/second      {writes / elapsed:.1f}")
+        if latencies:
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            self.stdout.write(f"  latency p50/p99    {p50:.1f} / {p99:.1f} ms")
+        self.stdout.write(f"  lock retries       {sum(report['retries'] for report in reports)}")
+        locked = sum(report["locked"] for report in reports)
+        failed = sum(report["failed"] for report in reports)
+        style = self.style.ERROR if locked or failed else self.style.SUCCESS
+        self.stdout.write(style(f"  locked failures    {locked}"))
+        self.stdout.write(style(f"  other failures     {failed}"))
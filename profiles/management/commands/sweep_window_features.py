@@ -0,0 +1,50 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from profiles.models import Customer, SyncWatermark
+from profiles.services.credit_scoring import compute_and_persist_credit_profile
+from profiles.services.daily_activity import SPEND_WINDOWS, customers_leaving_windows
+
+
+# SyncWatermark holding the ordinal of the last swept (local) date
+WATERMARK = "window_sweep"
+
+
+class Command(BaseCommand):
+    help = "Refresh profiles whose rolling spend windows lost activity since the last sweep (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Customers loaded per query (default: 500)")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the customers that would be refreshed")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        today = timezone.localdate()
+        watermark, _ = SyncWatermark.objects.get_or_create(name=WATERMARK)
+        since = date.fromordinal(watermark.position) if watermark.position else None
+        if since is not None and since >= today:
+            self.stdout.write(f"Already swept for {today}")
+            return
+
+        customer_ids = list(customers_leaving_windows(since, today))
+        scope = f"since {since}" if since else "for the first time"
+        windows = ", ".join(SPEND_WINDOWS)
+        if options["dry_run"]:
+            self.stdout.write(f"{len(customer_ids)} customers have activity leaving {windows} {scope}")
+            return
+
+        refreshed = 0
+        batch_size = max(1, options["batch_size"])
+        for start in range(0, len(customer_ids), batch_size):
+            for customer in Customer.objects.filter(pk__in=customer_ids[start:start + batch_size]):
+                compute_and_persist_credit_profile(customer)
+                refreshed += 1
+        # Only after every profile is refreshed, so an interrupted sweep is redone in full
+        watermark.position = today.toordinal()
+        watermark.save(update_fields=["position", "updated_at"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Swept {windows} {scope}: refreshed {refreshed} profiles in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,63 @@
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    # Nearest-rank percentile on an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = "Summarize scoring pipeline traces (p50/p95/p99 duration per stage)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=None, help="Trace file to read (default: SCORING_TRACE_FILE)")
+        parser.add_argument("--no-rotated", action="store_true", help="Ignore rotated backups (.1, .2, ...)")
+
+    def handle(self, *args, **options):
+        path = Path(options["file"] or settings.SCORING_TRACE_FILE)
+        files = [path]
+        if not options["no_rotated"]:
+            files += sorted(path.parent.glob(f"{path.name}.*"))
+        files = [f for f in files if f.exists()]
+        if not files:
+            raise CommandError(f"No trace files found at: {path}")
+
+        durations = defaultdict(list)
+        queries = defaultdict(int)
+        errors = defaultdict(int)
+        traces = set()
+        for trace_file in files:
+            with open(trace_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line from a rotation
+                    name = record["name"]
+                    durations[name].append(float(record["duration_ms"]))
+                    queries[name] += int(record.get("queries", 0))
+                    errors[name] += 1 if record.get("error") else 0
+                    traces.add(record["trace_id"])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{len(traces)} traces from {len(files)} file(s)"
+        ))
+        header = f"{'stage':<32} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'avg q':>6} {'errors':>6}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name in sorted(durations, key=lambda n: -sum(durations[n])):
+            values = sorted(durations[name])
+            count = len(values)
+            self.stdout.write(
+                f"{name:<32} {count:>7} {_percentile(values, 50):>9.2f} {_percentile(values, 95):>9.2f} "
+                f"{_percentile(values, 99):>9.2f} {values[-1]:>9.2f} {queries[name] / count:>6.1f} {errors[name]:>6}"
+            )
@@ -0,0 +1,104 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import routing
+
+
+class ReplicaStickinessMiddleware:
+    """Pin a client to the primary database for a short window after it writes.
+
+    Requests carrying the pin cookie never read from a replica, so a user
+    always sees their own changes despite replication lag. The cookie is set
+    when a non-GET request actually wrote to the database.
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS", "TRACE")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = {"pinned": routing.STICKY_COOKIE in request.COOKIES, "wrote": False}
+        token = routing._request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing._request_state.reset(token)
+        return self._pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = {"pinned": routing.STICKY_COOKIE in request.COOKIES, "wrote": False}
+        token = routing._request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing._request_state.reset(token)
+        return self._pin(request, response, state)
+
+    def _pin(self, request, response, state):
+        if state["wrote"] and request.method not in self.safe_methods and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                routing.STICKY_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that can run in an async middleware chain.
+
+    WhiteNoiseMiddleware is sync-only, which makes Django adapt the whole
+    chain to sync under ASGI and run every async view through a thread.
+    Under ASGI this looks the path up in WhiteNoise's file table and, for a
+    static file, reads it in a worker thread; any other request is awaited
+    straight through. Under WSGI it is plain WhiteNoise.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self._read_file, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+    @classmethod
+    def _read_file(cls, static_file, request):
+        # The ASGI handler would read a FileResponse's sync iterator into
+        # memory anyway (with a warning); do it here, off the event loop
+        streamed = cls.serve(static_file, request)
+        try:
+            response = HttpResponse(b"".join(streamed.streaming_content), status=streamed.status_code)
+        finally:
+            streamed.close()
+        del response["Content-Type"]
+        for key, value in streamed.items():
+            response[key] = value
+        return response
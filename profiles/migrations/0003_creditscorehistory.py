@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_history_from_profiles(apps, schema_editor):
+    # Start every existing customer's series at their current score
+    CreditProfile = apps.get_model('profiles', 'CreditProfile')
+    CreditScoreHistory = apps.get_model('profiles', 'CreditScoreHistory')
+    rows = [
+        CreditScoreHistory(customer_id=customer_id, score=score, risk_band=band, created_at=updated_at)
+        for customer_id, score, band, updated_at in CreditProfile.objects.values_list('customer_id', 'score', 'risk_band', 'updated_at').iterator()
+    ]
+    CreditScoreHistory.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_activitylog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditScoreHistory',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('score', models.IntegerField()),
+                ('risk_band', models.CharField(choices=[('A', 'Very Low Risk'), ('B', 'Low Risk'), ('C', 'Medium Risk'), ('D', 'High Risk'), ('E', 'Very High Risk')], max_length=1)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_history', to='profiles.customer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer', 'created_at'], name='profiles_cr_custome_cc0d6f_idx')],
+            },
+        ),
+        migrations.RunPython(seed_history_from_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def link_customers_to_users(apps, schema_editor):
+    # Customers were matched to accounts by exact email on every request;
+    # persist that match, as link_customer does at login. When several
+    # accounts share an email the oldest one wins, and it claims the oldest
+    # matching customer.
+    Customer = apps.get_model('profiles', 'Customer')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    users_by_email = {}
+    for user_id, email in User.objects.exclude(email='').order_by('-pk').values_list('pk', 'email').iterator():
+        users_by_email[email] = user_id
+    for customer in Customer.objects.filter(user__isnull=True).order_by('created_at').only('pk', 'email').iterator():
+        user_id = users_by_email.pop(customer.email, None)
+        if user_id is not None:
+            Customer.objects.filter(pk=customer.pk).update(user_id=user_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_creditscorehistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='customer', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(link_customers_to_users, migrations.RunPython.noop),
+    ]
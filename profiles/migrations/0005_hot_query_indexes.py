@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_customer_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creditprofile',
+            index=models.Index(fields=['risk_band', 'score'], name='profile_band_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['created_at'], name='customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'status'], name='order_customer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'created_at'], name='order_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'amount'], name='order_status_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['customer', 'success', 'method'], name='payment_customer_success_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['method'], name='payment_method_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:19
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_daily_activity(apps, schema_editor):
+    # Features are read from the rollup from now on, so it must be complete
+    # before the first recompute. A frozen copy of the rebuild at this point
+    # in history; the table was just created, so there is nothing to delete.
+    Order = apps.get_model('profiles', 'Order')
+    Payment = apps.get_model('profiles', 'Payment')
+    CustomerDailyActivity = apps.get_model('profiles', 'CustomerDailyActivity')
+
+    counters = ('orders', 'spend', 'delivered_orders', 'returned_orders', 'payments_succeeded', 'payments_failed', 'cod_payments')
+    buckets = defaultdict(lambda: dict.fromkeys(counters, 0))
+    order_rows = (
+        Order.objects.annotate(day=TruncDate('created_at'))
+        .values('customer_id', 'day')
+        .annotate(
+            n=Count('id'),
+            total=Sum('amount'),
+            delivered=Count('id', filter=Q(status='delivered')),
+            returned=Count('id', filter=Q(status='returned')),
+        )
+        .order_by()
+    )
+    for row in order_rows.iterator():
+        bucket = buckets[(row['customer_id'], row['day'])]
+        bucket.update(orders=row['n'], spend=row['total'] or 0, delivered_orders=row['delivered'], returned_orders=row['returned'])
+    payment_rows = (
+        Payment.objects.annotate(day=TruncDate('created_at'))
+        .values('customer_id', 'day')
+        .annotate(
+            succeeded=Count('id', filter=Q(success=True)),
+            failed=Count('id', filter=Q(success=False)),
+            cod=Count('id', filter=Q(method='cod')),
+        )
+        .order_by()
+    )
+    for row in payment_rows.iterator():
+        bucket = buckets[(row['customer_id'], row['day'])]
+        bucket.update(payments_succeeded=row['succeeded'], payments_failed=row['failed'], cod_payments=row['cod'])
+
+    CustomerDailyActivity.objects.bulk_create(
+        (CustomerDailyActivity(customer_id=customer_id, day=day, **values) for (customer_id, day), values in buckets.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerDailyActivity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('orders', models.IntegerField(default=0)),
+                ('spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('delivered_orders', models.IntegerField(default=0)),
+                ('returned_orders', models.IntegerField(default=0)),
+                ('payments_succeeded', models.IntegerField(default=0)),
+                ('payments_failed', models.IntegerField(default=0)),
+                ('cod_payments', models.IntegerField(default=0)),
+                ('customer', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to='profiles.customer')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('customer', 'day'), name='daily_activity_customer_day_uniq')],
+            },
+        ),
+        migrations.RunPython(build_daily_activity, migrations.RunPython.noop),
+    ]
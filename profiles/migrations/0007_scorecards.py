@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:23
+
+from django.db import migrations, models
+
+
+# Frozen copy of the scorecard that was hard-coded in score_from_features
+SCORECARD_V1 = {
+    "base": 600,
+    "min_score": 300,
+    "max_score": 1000,
+    "terms": [
+        {"feature": "total_spend", "divide_by": 100, "cap": 200},
+        {"feature": "delivered_orders", "multiply_by": 2, "cap": 100},
+        {"feature": "avg_order_value", "divide_by": 10, "cap": 80},
+        {"feature": "return_rate", "clip": 1, "multiply_by": -300},
+        {"feature": "failed_payment_rate", "clip": 1, "multiply_by": -200},
+        {"feature": "uses_cod", "at_least": 1, "points": -50},
+    ],
+    "bands": [["A", 800], ["B", 700], ["C", 600], ["D", 500], ["E", None]],
+}
+
+
+def add_scorecard_v1(apps, schema_editor):
+    Scorecard = apps.get_model("profiles", "Scorecard")
+    CreditProfile = apps.get_model("profiles", "CreditProfile")
+    Scorecard.objects.get_or_create(
+        version=1,
+        defaults={"name": "Original rule-based scorecard", "definition": SCORECARD_V1, "is_active": True},
+    )
+    # Every existing profile was scored by these rules
+    CreditProfile.objects.filter(scorecard_version__isnull=True).update(scorecard_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_customerdailyactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creditprofile',
+            name='scorecard_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Scorecard',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField(unique=True)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('definition', models.JSONField()),
+                ('is_active', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-version'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='scorecard_single_active')],
+            },
+        ),
+        migrations.RunPython(add_scorecard_v1, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_scorecards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('customer_id', models.UUIDField()),
+                ('source', models.CharField(choices=[('order', 'Order saved'), ('payment', 'Payment saved'), ('delete', 'Row deleted'), ('import', 'Bulk import'), ('rollup', 'Rollup rebuilt')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customerdailyactivity',
+            index=models.Index(fields=['day'], name='daily_activity_day_idx'),
+        ),
+    ]
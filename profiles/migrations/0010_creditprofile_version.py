@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_daily_activity_day_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creditprofile',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='customerchange',
+            name='source',
+            field=models.CharField(choices=[('order', 'Order saved'), ('payment', 'Payment saved'), ('delete', 'Row deleted'), ('import', 'Bulk import'), ('rollup', 'Rollup rebuilt'), ('conflict', 'Write conflict')], max_length=20),
+        ),
+    ]
@@ -1,5 +1,7 @@
 import uuid
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Customer(models.Model):
@@ -7,8 +9,20 @@ class Customer(models.Model):
     full_name = models.CharField(max_length=200)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=30, blank=True)
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="customer",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="customer_created_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.full_name} <{self.email}>"
 
@@ -28,6 +42,15 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="placed")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Named so profiles/query_plans.py can assert the planner keeps using them
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "status"], name="order_customer_status_idx"),
+            models.Index(fields=["customer", "created_at"], name="order_customer_created_idx"),
+            models.Index(fields=["status", "amount"], name="order_status_amount_idx"),
+            models.Index(fields=["created_at"], name="order_created_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Order {self.id} - {self.customer}"
 
@@ -48,6 +71,12 @@ class Payment(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "success", "method"], name="payment_customer_success_idx"),
+            models.Index(fields=["method"], name="payment_method_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Payment {self.id} - {self.customer} - {self.amount}"
 
@@ -66,12 +95,146 @@ class CreditProfile(models.Model):
     score = models.IntegerField(default=0)
     risk_band = models.CharField(max_length=1, choices=BAND_CHOICES, default="C")
     features = models.JSONField(default=dict, blank=True)
+    # Scorecard.version that produced score and risk_band
+    scorecard_version = models.PositiveIntegerField(null=True, blank=True)
+    # Bumped by every scoring write; writers compare-and-swap on it
+    # (services.credit_scoring) instead of locking the row
+    version = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["risk_band", "score"], name="profile_band_score_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"CreditProfile({self.customer}) = {self.score} ({self.risk_band})"
 
 
+class Scorecard(models.Model):
+    """A versioned scoring rule set, see services/scorecards.py for the format.
+
+    Add a new version rather than editing one in place: profiles record the
+    version they were scored with. Exactly one version is active at a time.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    version = models.PositiveIntegerField(unique=True)
+    name = models.CharField(max_length=100, blank=True)
+    definition = models.JSONField()
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-version"]
+        constraints = [
+            models.UniqueConstraint(fields=["is_active"], condition=models.Q(is_active=True), name="scorecard_single_active"),
+        ]
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        from .services.scorecards import ScorecardError, validate_definition
+
+        try:
+            validate_definition(self.definition)
+        except ScorecardError as exc:
+            raise ValidationError({"definition": str(exc)})
+
+    def __str__(self) -> str:
+        label = f"Scorecard v{self.version}" + (f" ({self.name})" if self.name else "")
+        return label + (" [active]" if self.is_active else "")
+
+
+class CreditScoreHistory(models.Model):
+    """One row per change of a customer's score or risk band."""
+
+    id = models.BigAutoField(primary_key=True)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="score_history")
+    score = models.IntegerField()
+    risk_band = models.CharField(max_length=1, choices=CreditProfile.BAND_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.customer_id} = {self.score} ({self.risk_band}) at {self.created_at}"
+
+
+class CustomerDailyActivity(models.Model):
+    """Per-customer, per-day totals that rolling-window features are summed from.
+
+    Orders and payments are bucketed by the local date they were created on.
+    Kept current by the order/payment signals; rebuild with
+    ``manage.py rebuild_daily_activity``.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # The (customer, day) unique index also serves per-customer lookups
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="daily_activity", db_index=False)
+    day = models.DateField()
+    orders = models.IntegerField(default=0)
+    spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    delivered_orders = models.IntegerField(default=0)
+    returned_orders = models.IntegerField(default=0)
+    payments_succeeded = models.IntegerField(default=0)
+    payments_failed = models.IntegerField(default=0)
+    cod_payments = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "day"], name="daily_activity_customer_day_uniq"),
+        ]
+        indexes = [
+            # Finds the buckets leaving a rolling window on a given day
+            models.Index(fields=["day"], name="daily_activity_day_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.customer_id} on {self.day}: {self.orders} orders, {self.spend} spend"
+
+
+class CustomerChange(models.Model):
+    """Append-only log of customers whose score inputs changed.
+
+    Written by the order/payment signals and by bulk paths through
+    ``services.change_tracking.mark_dirty``; consumed in id order by
+    ``recompute_scores --incremental``. ``customer_id`` is not a foreign key
+    so rows can be written while a customer is being deleted.
+    """
+
+    SOURCE_CHOICES = [
+        ("order", "Order saved"),
+        ("payment", "Payment saved"),
+        ("delete", "Row deleted"),
+        ("import", "Bulk import"),
+        ("rollup", "Rollup rebuilt"),
+        ("conflict", "Write conflict"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    customer_id = models.UUIDField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.customer_id} ({self.source})"
+
+
+class SyncWatermark(models.Model):
+    """Last CustomerChange id a named consumer has fully processed."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {self.position}"
+
+
 class ActivityLog(models.Model):
     SEVERITY_CHOICES = [
         ("info", "Info"),
@@ -0,0 +1,52 @@
+"""Hot queries and the index each one is expected to use.
+
+``python manage.py check_query_plans`` runs EXPLAIN on every entry and fails
+when a plan stops mentioning its index, so schema or query changes can't
+silently fall back to scanning. Add an entry when adding a query to a hot
+path (feature extraction, dashboards, list endpoints).
+"""
+import uuid
+from datetime import timedelta
+from typing import Callable, List, NamedTuple
+
+from django.db.models import Count, QuerySet, Sum
+from django.utils import timezone
+
+from .models import CreditProfile, Customer, CustomerDailyActivity, Order, Payment
+from .services.daily_activity import customers_leaving_windows
+
+
+class HotQuery(NamedTuple):
+    name: str
+    index: str
+    build: Callable[[uuid.UUID], QuerySet]
+
+
+# Boolean filters such as success=True compile to a bare column test on
+# SQLite, which can't seek an index, so they ride on a customer-led index.
+# Aggregates are expressed as .values()/.annotate() querysets because
+# QuerySet.explain() needs a queryset, not the result of .aggregate()/.count().
+HOT_QUERIES: List[HotQuery] = [
+    # extract_features, per customer: one aggregate over the daily rollup
+    HotQuery("daily_activity.rollup", "daily_activity_customer_day_uniq",
+             lambda cid: CustomerDailyActivity.objects.filter(customer_id=cid).values("customer").annotate(s=Sum("spend"))),
+    # sweep_window_features: buckets leaving a spend window
+    HotQuery("daily_activity.window_crossings", "daily_activity_day_idx",
+             lambda cid: customers_leaving_windows(timezone.localdate() - timedelta(days=1))),
+    # Customer dashboard and history
+    HotQuery("customer.recent_orders", "order_customer_created_idx",
+             lambda cid: Order.objects.filter(customer_id=cid).order_by("-created_at").values("id")[:10]),
+    HotQuery("customer.payment_success_count", "payment_customer_success_idx",
+             lambda cid: Payment.objects.filter(customer_id=cid, success=True).values("customer").annotate(n=Count("id"))),
+    # Staff dashboard, global
+    HotQuery("dashboard.band_count", "profile_band_score_idx",
+             lambda cid: CreditProfile.objects.filter(risk_band="A").values("risk_band").annotate(n=Count("id"))),
+    HotQuery("dashboard.order_status_count", "order_status_amount_idx",
+             lambda cid: Order.objects.filter(status="delivered").values("status").annotate(s=Sum("amount"))),
+    HotQuery("dashboard.recent_orders", "order_created_idx",
+             lambda cid: Order.objects.filter(created_at__gte=timezone.now() - timedelta(days=30)).values("id")),
+    HotQuery("dashboard.recent_customers", "customer_created_idx",
+             lambda cid: Customer.objects.filter(created_at__gte=timezone.now() - timedelta(days=30)).values("id")),
+    HotQuery("dashboard.payment_method_count", "payment_method_idx",
+             lambda cid: Payment.objects.filter(method="cod").values("method").annotate(n=Count("id"))),
+]
@@ -0,0 +1,218 @@
+import datetime
+import decimal
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders, json
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator; the stdlib path is always available
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+_encoder = encoders.JSONEncoder()
+
+# Datetimes go through DRF's encoder so "Z" suffixes and precision match
+# the stock renderer; UUIDs and dict subclasses are handled natively.
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Drop-in JSONRenderer that encodes with orjson when it is installed.
+
+    Output is byte-for-byte what JSONRenderer produces for strings, Decimals,
+    UUIDs, dates and datetimes. Floats below 1e-4 or from 1e16 up use orjson's
+    exponent spelling (``1e-05`` becomes ``0.00001``), which parses to the same
+    value. Indented output, ASCII-only output and anything orjson rejects fall
+    back to the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping of U+2028/U+2029 as JSONRenderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in JSONParser that decodes UTF-8 bodies with orjson when installed."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+        # Let the stdlib decide: it accepts a few inputs orjson doesn't (such as
+        # integers wider than 64 bits) and produces the usual error messages.
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(body.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+# MessagePack extension type codes. Datetimes use the standard Timestamp
+# extension (-1), which msgpack libraries in most languages decode natively.
+MSGPACK_EXT_DECIMAL = 1  # UTF-8 decimal string, e.g. b"249.99"
+MSGPACK_EXT_UUID = 2  # 16 raw bytes
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImproperlyConfigured("The msgpack package is required for application/x-msgpack")
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return msgpack.ExtType(MSGPACK_EXT_DECIMAL, str(obj).encode("utf-8"))
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(MSGPACK_EXT_UUID, obj.bytes)
+    if isinstance(obj, datetime.datetime) and obj.tzinfo is not None:
+        return msgpack.Timestamp.from_datetime(obj)
+    return _encoder.default(obj)
+
+
+def _msgpack_ext_hook(code, data):
+    if code == MSGPACK_EXT_DECIMAL:
+        return decimal.Decimal(data.decode("utf-8"))
+    if code == MSGPACK_EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def decode_msgpack(payload: bytes):
+    """Decode a MessagePackRenderer payload back into Decimal/UUID/datetime values."""
+    _require_msgpack()
+    return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, timestamp=3, strict_map_key=False)
+
+
+def _value_converters(serializer):
+    """Map field name -> callable turning the serializer's string output back into a typed value."""
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    converters = {}
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.DecimalField):
+            converters[name] = decimal.Decimal
+        elif isinstance(field, serializers.UUIDField):
+            converters[name] = uuid.UUID
+        elif isinstance(field, serializers.DateTimeField):
+            converters[name] = parse_datetime
+        elif isinstance(field, serializers.PrimaryKeyRelatedField) and model is not None:
+            related = model._meta.get_field(field.source).related_model
+            if isinstance(related._meta.pk, models.UUIDField):
+                converters[name] = uuid.UUID
+        elif isinstance(field, serializers.BaseSerializer) and not isinstance(field, serializers.ListSerializer):
+            nested = _value_converters(field)
+            converters[name] = lambda value, nested=nested: _convert(value, nested)
+    return converters
+
+
+def _convert(row, converters):
+    if not isinstance(row, dict):
+        return row
+    converted = dict(row)
+    for name, convert in converters.items():
+        value = converted.get(name)
+        if isinstance(value, (str, dict)):
+            converted[name] = convert(value)
+    return converted
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Compact binary encoding for batch consumers (``Accept: application/x-msgpack``).
+
+    Paginated lists keep ``count``/``next``/``previous`` but replace
+    ``results`` with a ``columns`` header and ``rows`` of values in that
+    order; without a serializer the columns are every key any row has, and
+    a row lacking one holds None there. Decimals, UUIDs and datetimes are sent as typed extension values
+    rather than strings; :func:`decode_msgpack` restores them losslessly.
+    """
+
+    media_type = "application/x-msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def _serializer_for(self, data, renderer_context):
+        serializer = getattr(data, "serializer", None)
+        view = renderer_context.get("view")
+        if serializer is None and view is not None and getattr(view, "action", None) in ("list", "retrieve"):
+            # Cached list responses are plain lists; the view's serializer describes them
+            serializer = view.get_serializer()
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        return serializer
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        _require_msgpack()
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        response = renderer_context.get("response")
+        if response is not None and response.status_code >= 400:
+            return msgpack.packb(data, default=_msgpack_default, datetime=False)
+
+        if isinstance(data, dict) and isinstance(data.get("results"), list):
+            results = data["results"]
+            serializer = self._serializer_for(results, renderer_context)
+            converters = _value_converters(serializer) if serializer is not None else {}
+            if serializer is not None:
+                columns = list(serializer.fields)
+            else:
+                # Rows of different shapes (e.g. found and not-found lookups):
+                # every key any row has, in first-seen order
+                columns = list(dict.fromkeys(key for row in results if isinstance(row, dict) for key in row))
+            if all(isinstance(row, dict) for row in results):
+                payload = {key: value for key, value in data.items() if key != "results"}
+                payload["columns"] = columns
+                payload["rows"] = [
+                    [row.get(column) for column in columns]
+                    for row in (_convert(row, converters) for row in results)
+                ]
+            else:
+                payload = {**data, "results": [_convert(row, converters) for row in results]}
+        else:
+            serializer = self._serializer_for(data, renderer_context)
+            payload = _convert(data, _value_converters(serializer)) if serializer is not None else data
+        return msgpack.packb(payload, default=_msgpack_default, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/x-msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return decode_msgpack(stream.read())
+        except ValueError as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
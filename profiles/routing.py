@@ -0,0 +1,135 @@
+"""Route marked read-only views to read replicas.
+
+Reads go to a replica only inside :func:`read_from_replica` (or a view
+decorated with :func:`use_replica` / a viewset using
+:class:`ReplicaListMixin`); everything else, and every write, uses
+``default``. A user who has just written is pinned to the primary for
+``DATABASE_REPLICA_STICKY_SECONDS`` so they always read their own writes.
+"""
+import contextvars
+import functools
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+# Cookie marking a browser/client as pinned to the primary after a write
+STICKY_COOKIE = "db_primary_pin"
+
+# True inside a replica-read scope, False inside an explicit primary scope
+_use_replica: contextvars.ContextVar[bool] = contextvars.ContextVar("use_replica", default=False)
+# Per-request {"pinned": bool, "wrote": bool}, set by ReplicaStickinessMiddleware
+_request_state: contextvars.ContextVar[Optional[Dict[str, bool]]] = contextvars.ContextVar("replica_request_state", default=None)
+
+# alias -> monotonic time before which the replica is not retried
+_unavailable_until: Dict[str, float] = {}
+
+
+@contextmanager
+def read_from_replica(enabled: bool = True):
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _scoped(view, enabled: bool):
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            # Async ORM calls copy this context into their worker thread
+            with read_from_replica(enabled):
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with read_from_replica(enabled):
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def use_replica(view):
+    """Serve a read-only view (or viewset method, sync or async) from a replica."""
+    return _scoped(view, True)
+
+
+def use_primary(view):
+    """Keep a view on the primary even when called inside a replica scope."""
+    return _scoped(view, False)
+
+
+def pinned_to_primary() -> bool:
+    """True when the current request has written or carries the sticky cookie."""
+    state = _request_state.get()
+    return state is not None and (state["pinned"] or state["wrote"])
+
+
+class ReplicaListMixin:
+    """Serve a viewset's ``list`` action from a replica."""
+
+    # CachedListMixin doesn't cache what may have come from a lagging replica
+    lists_from_replica = True
+
+    def list(self, request, *args, **kwargs):
+        with read_from_replica():
+            return super().list(request, *args, **kwargs)
+
+
+def _available(alias: str) -> bool:
+    if _unavailable_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning("Replica %s unavailable, reading from %s", alias, DEFAULT_DB_ALIAS, exc_info=True)
+        _unavailable_until[alias] = time.monotonic() + settings.DATABASE_REPLICA_RETRY_SECONDS
+        return False
+    return True
+
+
+def pick_replica() -> str:
+    replicas = list(settings.DATABASE_REPLICAS)
+    random.shuffle(replicas)
+    for alias in replicas:
+        if _available(alias):
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not _use_replica.get():
+            return None
+        if pinned_to_primary():
+            return None
+        return pick_replica()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # Later reads in this request must see the write
+            state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        pool = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes from the primary
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -1,35 +1,176 @@
+import math
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 
 from .models import CreditProfile, Customer, Order, Payment
+from .services.score_simulation import SOURCES as SIMULATION_SOURCES
+from .services.scorecards import FEATURE_NAME, MAX_MAGNITUDE, ScorecardError, validate_definition
+
+
+def _list_param(request, name):
+    # Sparse fieldsets only shape read responses; writes keep the full serializer
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    raw = request.query_params.get(name)
+    if raw is None:
+        return None
+    return {part.strip() for part in raw.split(",") if part.strip()}
+
+
+class SparseFieldsetMixin:
+    """Support ``?fields=a,b`` and ``?expand=relation`` on read requests.
+
+    Without either parameter the serializer keeps its full representation,
+    with the relations in ``Meta.default_expand`` nested. Once a client asks
+    for ``fields`` or ``expand``, relations are rendered as primary keys
+    unless named in ``expand``.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        # Nested serializers share the root's context but not its query params
+        self._nested = kwargs.pop("nested", False)
+        super().__init__(*args, **kwargs)
+
+    def get_field_selection(self):
+        if self._nested:
+            return None, set()
+        request = self.context.get("request")
+        selected = _list_param(request, "fields")
+        expand = _list_param(request, "expand")
+        if selected is None and expand is None:
+            return None, set(getattr(self.Meta, "default_expand", ()))
+        expand = expand or set()
+        if selected is not None:
+            selected |= expand
+        return selected, expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected, expand = self.get_field_selection()
+        if selected is not None:
+            for name in list(fields):
+                if name not in selected:
+                    fields.pop(name)
+        for name in expand:
+            if name in fields and name in self.expandable_fields:
+                fields[name] = self.expandable_fields[name](read_only=True, nested=True)
+        return fields
 
+    def narrow_queryset(self, queryset):
+        """Load only the columns (and joins) the selected fields will read."""
+        model = self.Meta.model
+        attnames = {f.attname: f.name for f in model._meta.concrete_fields}
+        only, related = [], []
+        for field in self.fields.values():
+            source = field.source
+            if isinstance(field, SparseFieldsetMixin):
+                related.append(source)
+                only.append(source)
+                only.extend(f"{source}__{sub.source}" for sub in field.fields.values())
+                continue
+            if source in attnames:
+                only.append(attnames[source])
+                continue
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return queryset  # Computed attribute; can't tell what it reads
+            if not model_field.concrete:
+                return queryset
+            only.append(model_field.name)
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
 
-class CustomerSerializer(serializers.ModelSerializer):
+
+class CustomerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = ["id", "full_name", "email", "phone", "created_at"]
         read_only_fields = ["id", "created_at"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {"customer": CustomerSerializer}
+
     class Meta:
         model = Order
         fields = ["id", "customer", "amount", "status", "created_at"]
         read_only_fields = ["id", "created_at"]
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {"customer": CustomerSerializer, "order": OrderSerializer}
+
     class Meta:
         model = Payment
         fields = ["id", "customer", "order", "method", "success", "amount", "created_at"]
         read_only_fields = ["id", "created_at"]
 
 
-class CreditProfileSerializer(serializers.ModelSerializer):
-    customer = CustomerSerializer(read_only=True)
+class CreditProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    customer_id = serializers.UUIDField(read_only=True)
+    expandable_fields = {"customer": CustomerSerializer}
 
     class Meta:
         model = CreditProfile
-        fields = ["id", "customer", "score", "risk_band", "features", "updated_at"]
-        read_only_fields = ["id", "updated_at", "score", "risk_band", "features"]
+        fields = ["id", "customer", "customer_id", "score", "risk_band", "scorecard_version", "version", "features", "updated_at"]
+        read_only_fields = ["id", "customer", "updated_at", "score", "risk_band", "scorecard_version", "version", "features"]
+        default_expand = ["customer"]
+
+
+class ScoreHistoryQuerySerializer(serializers.Serializer):
+    bucket = serializers.ChoiceField(choices=["raw", "daily", "weekly"], default="daily")
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+
+class CreditProfileLookupSerializer(serializers.Serializer):
+    customers = serializers.ListField(
+        child=serializers.CharField(max_length=254),
+        allow_empty=False,
+        max_length=settings.CREDIT_PROFILE_LOOKUP_MAX_KEYS,
+        help_text="Customer ids and/or emails, in the order results should be returned",
+    )
+    include_features = serializers.BooleanField(default=False)
+
+
+class ScoreSimulationSerializer(serializers.Serializer):
+    customers = serializers.ListField(
+        child=serializers.CharField(max_length=254),
+        required=False,
+        allow_empty=False,
+        max_length=settings.CREDIT_PROFILE_LOOKUP_MAX_KEYS,
+        help_text="Customer ids and/or emails to simulate; omit for the whole portfolio",
+    )
+    overrides = serializers.DictField(
+        child=serializers.FloatField(), required=False, help_text="Feature values to apply, e.g. {\"return_rate\": 0.1}"
+    )
+    scorecard = serializers.JSONField(required=False, help_text="Candidate scorecard definition to compare with the active one")
+    limit = serializers.IntegerField(default=100, min_value=1, max_value=1000, help_text="Portfolio runs: largest moves to return")
+    source = serializers.ChoiceField(choices=SIMULATION_SOURCES, default="auto")
+
+    def validate_overrides(self, value):
+        for name, number in value.items():
+            if not FEATURE_NAME.match(name):
+                raise serializers.ValidationError(f"{name!r} is not a feature name")
+            if not math.isfinite(number) or abs(number) > MAX_MAGNITUDE:
+                raise serializers.ValidationError(f"{name} must be between -{MAX_MAGNITUDE:g} and {MAX_MAGNITUDE:g}")
+        return value
 
+    def validate_scorecard(self, value):
+        try:
+            return validate_definition(value)
+        except ScorecardError as exc:
+            raise serializers.ValidationError(str(exc))
 
+    def validate(self, attrs):
+        if not attrs.get("overrides") and "scorecard" not in attrs:
+            raise serializers.ValidationError("Give feature overrides, a candidate scorecard, or both")
+        return attrs
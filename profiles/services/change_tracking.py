@@ -0,0 +1,110 @@
+"""Which customers need their credit profile recomputed.
+
+Every path that can change a customer's score inputs appends a
+CustomerChange row: the order/payment signals (saves and deletes) do it
+automatically, and bulk paths that bypass signals (``bulk_create``,
+``QuerySet.update``, raw SQL imports) must call :func:`mark_dirty`.
+
+A consumer such as ``recompute_scores --incremental`` reads the log in id
+order from its SyncWatermark, and advances the watermark only after a
+batch has been processed, so a crash means the batch is redone rather
+than lost. Rows every consumer has passed are pruned.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from ..models import Customer, CustomerChange, SyncWatermark
+
+
+def mark_dirty(customer_ids: Iterable, source: str, batch_size: int = 1000) -> int:
+    """Record that these customers' score inputs changed. Returns the number of rows written."""
+    now = timezone.now()
+    rows = [
+        CustomerChange(customer_id=customer_id, source=source, created_at=now)
+        for customer_id in dict.fromkeys(customer_ids)
+        if customer_id is not None
+    ]
+    CustomerChange.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def pending(name: str) -> int:
+    """Change rows past ``name``'s watermark."""
+    position = SyncWatermark.objects.filter(name=name).values_list("position", flat=True).first() or 0
+    return CustomerChange.objects.filter(id__gt=position).count()
+
+
+def latest_position() -> int:
+    return CustomerChange.objects.aggregate(last=Max("id"))["last"] or 0
+
+
+def advance_watermark(name: str, position: int) -> None:
+    """Move ``name`` forward to ``position``, e.g. after a full recompute that started once ``position`` was logged."""
+    with transaction.atomic():
+        watermark, _ = SyncWatermark.objects.select_for_update().get_or_create(name=name)
+        if position > watermark.position:
+            watermark.position = position
+            watermark.save(update_fields=["position", "updated_at"])
+        _prune()
+
+
+def _prune() -> None:
+    low = SyncWatermark.objects.aggregate(low=Min("position"))["low"]
+    if low:
+        CustomerChange.objects.filter(id__lte=low).delete()
+
+
+def process_changes(
+    name: str,
+    handler: Callable[[Customer], object],
+    batch_size: int = 500,
+    settle_seconds: Optional[int] = None,
+) -> Dict[str, int]:
+    """Call ``handler`` once per changed customer since ``name``'s watermark.
+
+    Rows written in the last ``settle_seconds`` (default
+    ``CHANGE_TRACKING_SETTLE_SECONDS``) and everything after them are left
+    for the next run: ids are allocated before commit, so a younger row
+    can still have a smaller id than a committed one. Customers that no
+    longer exist are skipped.
+    """
+    settle_seconds = settings.CHANGE_TRACKING_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+    watermark, _ = SyncWatermark.objects.get_or_create(name=name)
+    position = watermark.position
+
+    changes = CustomerChange.objects.filter(id__gt=position)
+    unsettled = changes.filter(created_at__gt=timezone.now() - timedelta(seconds=settle_seconds)).aggregate(first=Min("id"))["first"]
+    if unsettled is not None:
+        changes = changes.filter(id__lt=unsettled)
+
+    stats = {"changes": 0, "customers": 0, "missing": 0, "position": position}
+    seen = set()
+    while True:
+        batch = list(changes.filter(id__gt=position).order_by("id").values_list("id", "customer_id")[:batch_size])
+        if not batch:
+            break
+        customer_ids = [customer_id for _, customer_id in batch if customer_id not in seen]
+        customers = Customer.objects.in_bulk(customer_ids)
+        for customer_id in dict.fromkeys(customer_ids):
+            seen.add(customer_id)
+            customer = customers.get(customer_id)
+            if customer is None:
+                stats["missing"] += 1
+                continue
+            handler(customer)
+            stats["customers"] += 1
+
+        position = batch[-1][0]
+        with transaction.atomic():
+            SyncWatermark.objects.filter(name=name).update(position=position, updated_at=timezone.now())
+            _prune()
+        stats["changes"] += len(batch)
+        stats["position"] = position
+    return stats
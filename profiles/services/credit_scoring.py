@@ -1,103 +1,131 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from decimal import Decimal
-from typing import Dict, Tuple
+import logging
+from typing import Dict, Optional, Tuple
 
-from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.utils import timezone
 
-from ..models import Customer, CreditProfile, Order, Payment
+from ..models import Customer, CreditProfile
+from . import change_tracking
+from .daily_activity import rollup_features
+from .metrics import increment
+from .scorecards import active_scorecard
+from .tracing import span
 
 
-def _safe_decimal(value: Decimal | None) -> Decimal:
-    return Decimal("0.00") if value is None else Decimal(value)
+logger = logging.getLogger(__name__)
 
 
 def extract_features(customer: Customer) -> Dict[str, float]:
-    now = datetime.utcnow()
-    window_30d = now - timedelta(days=30)
-    window_180d = now - timedelta(days=180)
-
-    orders = Order.objects.filter(customer=customer)
-    payments = Payment.objects.filter(customer=customer)
-
-    delivered = orders.filter(status="delivered")
-    returned = orders.filter(status="returned")
-
-    # Aggregations
-    total_orders = orders.count()
-    delivered_orders = delivered.count()
-    returned_orders = returned.count()
-    return_rate = (returned_orders / delivered_orders) if delivered_orders else 0.0
-
-    total_spend = _safe_decimal(orders.aggregate(s=Sum("amount"))['s'])
-    avg_order_value = _safe_decimal(orders.aggregate(a=Avg("amount"))['a'])
-
-    spend_30d = _safe_decimal(orders.filter(created_at__gte=window_30d).aggregate(s=Sum("amount"))['s'])
-    spend_180d = _safe_decimal(orders.filter(created_at__gte=window_180d).aggregate(s=Sum("amount"))['s'])
-
-    successful_payments = payments.filter(success=True).count()
-    failed_payments = payments.filter(success=False).count()
-    failure_rate = (failed_payments / (successful_payments + failed_payments)) if (successful_payments + failed_payments) else 0.0
-
-    uses_cod = payments.filter(method="cod").exists()
-
-    features = {
-        "total_orders": float(total_orders),
-        "delivered_orders": float(delivered_orders),
-        "returned_orders": float(returned_orders),
-        "return_rate": float(return_rate),
-        "total_spend": float(total_spend),
-        "avg_order_value": float(avg_order_value),
-        "spend_30d": float(spend_30d),
-        "spend_180d": float(spend_180d),
-        "failed_payment_rate": float(failure_rate),
-        "uses_cod": 1.0 if uses_cod else 0.0,
-    }
-
-    return features
+    # Summed from the per-day rollup rather than raw orders/payments; see
+    # services.daily_activity.SPEND_WINDOWS to add rolling windows.
+    return rollup_features(customer.pk)
 
 
 def score_from_features(features: Dict[str, float]) -> Tuple[int, str]:
-    # Simple rule-based scorecard (0-1000)
-    score = 600
-
-    score += min(200, int(features.get("total_spend", 0) / 100.0))
-    score += min(100, int(features.get("delivered_orders", 0) * 2))
-    score += min(80, int(features.get("avg_order_value", 0) / 10.0))
-
-    score -= int(300 * min(1.0, features.get("return_rate", 0)))
-    score -= int(200 * min(1.0, features.get("failed_payment_rate", 0)))
-    score -= 50 if features.get("uses_cod", 0) >= 1 else 0
-
-    score = max(300, min(1000, score))
-
-    if score >= 800:
-        band = "A"
-    elif score >= 700:
-        band = "B"
-    elif score >= 600:
-        band = "C"
-    elif score >= 500:
-        band = "D"
-    else:
-        band = "E"
-
-    return score, band
+    """Score and band from the active scorecard (see services.scorecards)."""
+    return active_scorecard().score(features)
 
 
 def compute_and_persist_credit_profile(customer: Customer) -> CreditProfile:
-    features = extract_features(customer)
-    score, band = score_from_features(features)
-
-    profile, _ = CreditProfile.objects.update_or_create(
-        customer=customer,
-        defaults={
-            "score": score,
-            "risk_band": band,
-            "features": features,
-        },
-    )
+    """Score ``customer`` from its current activity and store the result.
+
+    No row lock is taken: the profile is written only if its ``version`` is
+    still the one read before the features were extracted. A writer that
+    loses (another order, payment or worker for the same customer committed
+    in between) re-reads and rescores, up to ``CREDIT_PROFILE_WRITE_ATTEMPTS``
+    times, so the last write always reflects the newest data it could see.
+    If every attempt conflicts the customer is queued for
+    ``recompute_scores --incremental`` and the stored profile is returned.
+    """
+    with span("scoring.compute", customer_id=str(customer.pk)):
+        attempts = max(1, settings.CREDIT_PROFILE_WRITE_ATTEMPTS)
+        for attempt in range(attempts):
+            profile = CreditProfile.objects.filter(customer=customer).first()
+            with span("scoring.extract_features"):
+                features = extract_features(customer)
+            scorecard = active_scorecard()
+            with span("scoring.score", scorecard_version=scorecard.version):
+                score, band = scorecard.score(features)
+
+            with span("scoring.upsert", attempt=attempt):
+                if profile is None:
+                    profile = _create(customer, score, band, features, scorecard.version)
+                else:
+                    profile.customer = customer
+                    if (
+                        profile.score == score
+                        and profile.risk_band == band
+                        and profile.features == features
+                        and profile.scorecard_version == scorecard.version
+                    ):
+                        # Nothing moved: skip the UPDATE and the audit row it would trigger,
+                        # unless another writer replaced what was read meanwhile
+                        if CreditProfile.objects.filter(pk=profile.pk, version=profile.version).exists():
+                            increment("credit_profile.writes_skipped")
+                            return profile
+                        profile = None
+                    else:
+                        profile = _compare_and_swap(profile, score, band, features, scorecard.version)
+            if profile is not None:
+                increment("credit_profile.writes_applied")
+                return profile
+            increment("credit_profile.write_conflicts")
+
+        # Still contended; the next incremental recompute settles it
+        change_tracking.mark_dirty([customer.pk], "conflict")
+        increment("credit_profile.writes_deferred")
+        logger.warning("Credit profile for %s still conflicted after %d attempts", customer.pk, attempts)
+        profile = CreditProfile.objects.filter(customer=customer).first()
+        if profile is not None:
+            profile.customer = customer
     return profile
 
 
+def _create(customer: Customer, score: int, band: str, features: Dict[str, float], scorecard_version: int) -> Optional[CreditProfile]:
+    """Insert the first profile, or None if a concurrent writer inserted it first."""
+    try:
+        # Savepoint, so losing the race doesn't break an enclosing transaction
+        with transaction.atomic():
+            return CreditProfile.objects.create(
+                customer=customer, score=score, risk_band=band, features=features, scorecard_version=scorecard_version
+            )
+    except IntegrityError:
+        return None
+
+
+def _compare_and_swap(
+    profile: CreditProfile, score: int, band: str, features: Dict[str, float], scorecard_version: int
+) -> Optional[CreditProfile]:
+    """UPDATE ``profile`` only if its version is unchanged; None if another write got there first."""
+    values = {
+        "score": score,
+        "risk_band": band,
+        "features": features,
+        "scorecard_version": scorecard_version,
+        "updated_at": timezone.now(),
+    }
+    using = router.db_for_write(CreditProfile, instance=profile)
+    written = CreditProfile.objects.using(using).filter(pk=profile.pk, version=profile.version).update(
+        version=F("version") + 1, **values
+    )
+    if not written:
+        return None
+    for name, value in values.items():
+        setattr(profile, name, value)
+    profile.version += 1
+    # QuerySet.update() skips signals; send the one save() would for the
+    # history row, audit log and cache invalidation
+    post_save.send(
+        sender=CreditProfile,
+        instance=profile,
+        created=False,
+        update_fields=frozenset([*values, "version"]),
+        raw=False,
+        using=using,
+    )
+    return profile
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+
+from ..models import Customer
+
+
+# Session key holding the signed-in user's customer id. Django flushes or
+# cycles the session whenever the authenticated user changes, so the value
+# never outlives the login it was stored for.
+SESSION_KEY = "_customer_id"
+
+
+def link_customer(user, create: bool = False) -> Optional[Customer]:
+    """Return the customer linked to ``user``, claiming an unlinked one with the same email.
+
+    With ``create`` a customer is created for users that have an email but no
+    customer record yet. Used at login and registration, never per request.
+    """
+    customer = Customer.objects.filter(user=user).first()
+    if customer is not None or not user.email:
+        return customer
+    try:
+        with transaction.atomic():
+            # Same exact-email match as before accounts were linked; claim one row,
+            # and only if no other login took it in the meantime
+            candidate = (
+                Customer.objects.filter(user__isnull=True, email=user.email).order_by("created_at").values_list("pk", flat=True).first()
+            )
+            if candidate is not None and Customer.objects.filter(pk=candidate, user__isnull=True).update(user=user):
+                return Customer.objects.get(pk=candidate)
+            if not create:
+                return None
+            return Customer.objects.create(
+                user=user,
+                full_name=user.get_full_name() or user.username,
+                email=user.email,
+                phone="",
+            )
+    except IntegrityError:
+        # A concurrent login linked this user, or the email belongs to another account's customer
+        return Customer.objects.filter(user=user).first()
+
+
+def remember_customer(request, customer: Optional[Customer]) -> None:
+    customer_id = None if customer is None else str(customer.pk)
+    # Only touch the session on change so reads don't trigger a session save
+    if request.session.get(SESSION_KEY) == customer_id:
+        return
+    if customer_id is None:
+        request.session.pop(SESSION_KEY, None)
+    else:
+        request.session[SESSION_KEY] = customer_id
+
+
+async def aremember_customer(request, customer: Optional[Customer]) -> None:
+    customer_id = None if customer is None else str(customer.pk)
+    if await request.session.aget(SESSION_KEY) == customer_id:
+        return
+    if customer_id is None:
+        await request.session.apop(SESSION_KEY, None)
+    else:
+        await request.session.aset(SESSION_KEY, customer_id)
+
+
+async def aget_request_customer(request) -> Optional[Customer]:
+    """The signed-in user's customer with its credit profile, in a single joined query.
+
+    The customer id kept in the session narrows the lookup to a primary-key
+    match; the result is memoized on the request.
+    """
+    if hasattr(request, "_cached_customer"):
+        return request._cached_customer
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    customers = Customer.objects.select_related("credit_profile")
+    customer_id = await request.session.aget(SESSION_KEY)
+    if customer_id is not None:
+        customer = await customers.filter(pk=customer_id, user=user).afirst()
+    else:
+        customer = await customers.filter(user=user).afirst()
+    await aremember_customer(request, customer)
+    request._cached_customer = customer
+    return customer
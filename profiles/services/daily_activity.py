@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, QuerySet, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+# Rolling spend windows, in days, exposed as features. Each is a sum over at
+# most that many daily buckets; add an entry to add a feature.
+SPEND_WINDOWS = {
+    "spend_30d": 30,
+    "spend_180d": 180,
+}
+
+COUNTERS = ("orders", "spend", "delivered_orders", "returned_orders", "payments_succeeded", "payments_failed", "cod_payments")
+
+
+def _day(ts) -> date:
+    return timezone.localdate(ts) if timezone.is_aware(ts) else ts.date()
+
+
+def order_state(order) -> Optional[Tuple]:
+    """What an order contributes to the rollup; None if any part wasn't loaded."""
+    state = tuple(order.__dict__.get(name) for name in ("customer_id", "created_at", "amount", "status"))
+    return None if None in state else state
+
+
+def payment_state(payment) -> Optional[Tuple]:
+    state = tuple(payment.__dict__.get(name) for name in ("customer_id", "created_at", "success", "method"))
+    return None if None in state else state
+
+
+def _order_deltas(state: Tuple, sign: int) -> Dict[str, object]:
+    _, _, amount, status = state
+    return {
+        "orders": sign,
+        "spend": sign * Decimal(amount),
+        "delivered_orders": sign if status == "delivered" else 0,
+        "returned_orders": sign if status == "returned" else 0,
+    }
+
+
+def _payment_deltas(state: Tuple, sign: int) -> Dict[str, int]:
+    _, _, success, method = state
+    return {
+        "payments_succeeded": sign if success else 0,
+        "payments_failed": 0 if success else sign,
+        "cod_payments": sign if method == "cod" else 0,
+    }
+
+
+def _apply(customer_id, day: date, deltas: Dict[str, object]) -> None:
+    from ..models import CustomerDailyActivity
+
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    bucket = CustomerDailyActivity.objects.filter(customer_id=customer_id, day=day)
+    if bucket.update(**{name: F(name) + value for name, value in deltas.items()}):
+        return
+    try:
+        with transaction.atomic():
+            CustomerDailyActivity.objects.create(customer_id=customer_id, day=day, **deltas)
+    except IntegrityError:
+        # Another writer created the bucket first
+        bucket.update(**{name: F(name) + value for name, value in deltas.items()})
+
+
+def _record_change(old: Optional[Tuple], new: Optional[Tuple], deltas) -> None:
+    if old == new:
+        return
+    if old is not None:
+        _apply(old[0], _day(old[1]), deltas(old, -1))
+    if new is not None:
+        _apply(new[0], _day(new[1]), deltas(new, 1))
+
+
+def record_order_change(old: Optional[Tuple], new: Optional[Tuple]) -> None:
+    """Move an order's contribution from its ``old`` state to its ``new`` one (None = absent)."""
+    _record_change(old, new, _order_deltas)
+
+
+def record_payment_change(old: Optional[Tuple], new: Optional[Tuple]) -> None:
+    _record_change(old, new, _payment_deltas)
+
+
+def rollup_features(customer_id, today: Optional[date] = None) -> Dict[str, float]:
+    """Feature dict for one customer from its daily buckets, in one query."""
+    from ..models import CustomerDailyActivity
+
+    today = today or timezone.localdate()
+    windows = {
+        name: Sum("spend", filter=Q(day__gt=today - timedelta(days=days)))
+        for name, days in SPEND_WINDOWS.items()
+    }
+    totals = CustomerDailyActivity.objects.filter(customer_id=customer_id).aggregate(
+        **{f"sum_{name}": Sum(name) for name in COUNTERS}, **windows
+    )
+    total_orders = totals["sum_orders"] or 0
+    delivered_orders = totals["sum_delivered_orders"] or 0
+    returned_orders = totals["sum_returned_orders"] or 0
+    total_spend = totals["sum_spend"] or Decimal("0.00")
+    succeeded = totals["sum_payments_succeeded"] or 0
+    failed = totals["sum_payments_failed"] or 0
+
+    features = {
+        "total_orders": float(total_orders),
+        "delivered_orders": float(delivered_orders),
+        "returned_orders": float(returned_orders),
+        "return_rate": float(returned_orders / delivered_orders) if delivered_orders else 0.0,
+        "total_spend": float(total_spend),
+        "avg_order_value": float(total_spend / total_orders) if total_orders else 0.0,
+    }
+    features.update((name, float(totals[name] or 0)) for name in SPEND_WINDOWS)
+    features["failed_payment_rate"] = float(failed / (succeeded + failed)) if (succeeded + failed) else 0.0
+    features["uses_cod"] = 1.0 if totals["sum_cod_payments"] else 0.0
+    return features
+
+
+def customers_leaving_windows(since: Optional[date], today: Optional[date] = None) -> QuerySet:
+    """Customers with spend that dropped out of a SPEND_WINDOWS window after ``since``, up to ``today``.
+
+    A bucket counts towards an N-day window while ``day > today - N``, so
+    between two sweeps it leaves the window iff ``since - N < day <= today - N``.
+    ``since=None`` means every bucket that has ever left a window.
+    """
+    from ..models import CustomerDailyActivity
+
+    today = today or timezone.localdate()
+    leaving = Q()
+    for days in SPEND_WINDOWS.values():
+        window = Q(day__lte=today - timedelta(days=days))
+        if since is not None:
+            window &= Q(day__gt=since - timedelta(days=days))
+        leaving |= window
+    return (
+        CustomerDailyActivity.objects.filter(leaving)
+        .exclude(spend=0)
+        .values_list("customer_id", flat=True)
+        .distinct()
+        .order_by()
+    )
+
+
+def rebuild_daily_activity(customer_ids: Optional[Iterable] = None, batch_size: int = 1000) -> int:
+    """Recompute buckets from raw orders and payments; all customers when ``customer_ids`` is None.
+
+    Returns the number of buckets written.
+    """
+    from ..models import CustomerDailyActivity, Order, Payment
+
+    orders, payments, existing = Order.objects.all(), Payment.objects.all(), CustomerDailyActivity.objects.all()
+    if customer_ids is not None:
+        customer_ids = list(customer_ids)
+        orders = orders.filter(customer_id__in=customer_ids)
+        payments = payments.filter(customer_id__in=customer_ids)
+        existing = existing.filter(customer_id__in=customer_ids)
+
+    buckets = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    order_rows = (
+        orders.annotate(day=TruncDate("created_at"))
+        .values("customer_id", "day")
+        .annotate(
+            n=Count("id"),
+            total=Sum("amount"),
+            delivered=Count("id", filter=Q(status="delivered")),
+            returned=Count("id", filter=Q(status="returned")),
+        )
+        .order_by()
+    )
+    for row in order_rows.iterator():
+        bucket = buckets[(row["customer_id"], row["day"])]
+        bucket.update(orders=row["n"], spend=row["total"] or 0, delivered_orders=row["delivered"], returned_orders=row["returned"])
+    payment_rows = (
+        payments.annotate(day=TruncDate("created_at"))
+        .values("customer_id", "day")
+        .annotate(
+            succeeded=Count("id", filter=Q(success=True)),
+            failed=Count("id", filter=Q(success=False)),
+            cod=Count("id", filter=Q(method="cod")),
+        )
+        .order_by()
+    )
+    for row in payment_rows.iterator():
+        bucket = buckets[(row["customer_id"], row["day"])]
+        bucket.update(payments_succeeded=row["succeeded"], payments_failed=row["failed"], cod_payments=row["cod"])
+
+    with transaction.atomic():
+        existing.delete()
+        CustomerDailyActivity.objects.bulk_create(
+            (CustomerDailyActivity(customer_id=customer_id, day=day, **values) for (customer_id, day), values in buckets.items()),
+            batch_size=batch_size,
+        )
+    return len(buckets)
@@ -0,0 +1,355 @@
+"""Columnar on-disk snapshot of every credit profile, for offline analysis.
+
+A snapshot is a directory with one ``.npy`` file per column, all of the
+same length and ordered by profile id, plus ``manifest.json``::
+
+    profile_id         int64
+    customer_id        S32 (UUID hex)
+    score              int32
+    risk_band          S1
+    scorecard_version  int32 (0 when unknown)
+    version            int64 (CreditProfile.version)
+    updated_at         datetime64[us], UTC
+    feature.<name>     float64, NaN where the profile lacks the feature
+
+:func:`load_snapshot` opens the columns with ``mmap_mode="r"``, so a
+multi-million-row snapshot opens without reading it and pages are shared
+between processes. :func:`refresh_snapshot` re-reads only profiles updated
+since the previous run (plus any new ids) and writes the result as a new
+generation of files; the manifest is swapped last, so readers see either
+the old snapshot or the new one, and arrays already mapped stay valid.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import CreditProfile
+
+try:
+    import numpy
+except ImportError:  # Only needed to write or read snapshots
+    numpy = None
+
+
+FORMAT = 1
+MANIFEST = "manifest.json"
+FEATURE_PREFIX = "feature."
+
+COLUMNS = {
+    "profile_id": "<i8",
+    "customer_id": "S32",
+    "score": "<i4",
+    "risk_band": "S1",
+    "scorecard_version": "<i4",
+    "version": "<i8",
+    "updated_at": "<M8[us]",
+}
+FEATURE_DTYPE = "<f8"
+
+_FIELDS = ("id", "customer_id", "score", "risk_band", "scorecard_version", "version", "updated_at", "features")
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class FeatureSnapshot:
+    """Memory-mapped columns of one snapshot generation."""
+
+    def __init__(self, directory: Path, manifest: Dict, columns: Dict[str, "numpy.ndarray"]):
+        self.directory = directory
+        self.manifest = manifest
+        self.columns = columns
+        self.features = tuple(name[len(FEATURE_PREFIX):] for name in columns if name.startswith(FEATURE_PREFIX))
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+    def __getitem__(self, name: str) -> "numpy.ndarray":
+        return self.columns[name]
+
+    def feature(self, name: str) -> "numpy.ndarray":
+        return self.columns[FEATURE_PREFIX + name]
+
+
+def _require_numpy() -> None:
+    if numpy is None:
+        raise SnapshotError("Feature snapshots need numpy: pip install numpy")
+
+
+def _read_manifest(directory: Path) -> Optional[Dict]:
+    try:
+        with open(directory / MANIFEST, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except FileNotFoundError:
+        return None
+    if manifest.get("format") != FORMAT:
+        raise SnapshotError(f"{directory} holds snapshot format {manifest.get('format')}, expected {FORMAT}")
+    return manifest
+
+
+def load_snapshot(directory=None, mmap_mode: Optional[str] = "r") -> FeatureSnapshot:
+    """Open a snapshot; columns are memory-mapped unless ``mmap_mode`` is None."""
+    _require_numpy()
+    directory = Path(directory or settings.FEATURE_SNAPSHOT_DIR)
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        raise SnapshotError(f"No feature snapshot in {directory}")
+    columns = {
+        name: numpy.load(directory / column["file"], mmap_mode=mmap_mode)
+        for name, column in manifest["columns"].items()
+    }
+    return FeatureSnapshot(directory, manifest, columns)
+
+
+def _micros(value: datetime) -> int:
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _rows(queryset, chunk_size: int) -> Iterator[List[tuple]]:
+    """Profile rows in primary-key chunks."""
+    last_pk = None
+    while True:
+        chunk_qs = queryset.order_by("pk")
+        if last_pk is not None:
+            chunk_qs = chunk_qs.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs.values_list(*_FIELDS)[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        yield chunk
+
+
+class _Writer:
+    """Fills one generation's column files, adding feature columns as they are seen."""
+
+    def __init__(self, directory: Path, generation: int, rows: int):
+        self.directory = directory
+        self.generation = generation
+        self.rows = rows
+        self.columns: Dict[str, "numpy.ndarray"] = {}
+        self.dtypes: Dict[str, str] = {}
+        self.filled = numpy.zeros(rows, dtype=bool)
+        for name, dtype in COLUMNS.items():
+            self._create(name, dtype)
+
+    def _file(self, name: str) -> str:
+        return f"{name}.{self.generation}.npy"
+
+    def _create(self, name: str, dtype: str, fill=None) -> "numpy.ndarray":
+        array = numpy.lib.format.open_memmap(
+            self.directory / self._file(name), mode="w+", dtype=numpy.dtype(dtype), shape=(self.rows,)
+        )
+        if fill is not None:
+            array[:] = fill
+        self.columns[name] = array
+        self.dtypes[name] = dtype
+        return array
+
+    def column(self, name: str) -> "numpy.ndarray":
+        array = self.columns.get(name)
+        if array is None:
+            array = self._create(name, FEATURE_DTYPE, fill=numpy.nan)
+        return array
+
+    def copy(self, source: FeatureSnapshot, source_rows: "numpy.ndarray", positions: "numpy.ndarray") -> None:
+        """Carry rows over from the previous generation."""
+        for name, array in source.columns.items():
+            target = self.column(name) if name.startswith(FEATURE_PREFIX) else self.columns[name]
+            target[positions] = array[source_rows]
+        self.filled[positions] = True
+
+    def _compact(self) -> None:
+        # Profiles deleted between listing the ids and reading their rows
+        keep = self.filled
+        self.rows = int(keep.sum())
+        for name in list(self.columns):
+            # Copy out and drop the mapping before the file is recreated smaller
+            values = numpy.array(self.columns.pop(name)[keep])
+            self._create(name, self.dtypes[name])[:] = values
+        self.filled = numpy.ones(self.rows, dtype=bool)
+
+    def write(self, positions: "numpy.ndarray", chunk: List[tuple]) -> None:
+        """Write freshly read profile rows at ``positions``."""
+        count = len(chunk)
+        if not count:
+            return
+        self.filled[positions] = True
+        ids, customer_ids, scores, bands, scorecards, versions, updated, features = zip(*chunk)
+        self.columns["profile_id"][positions] = ids
+        self.columns["customer_id"][positions] = [customer_id.hex.encode("ascii") for customer_id in customer_ids]
+        self.columns["score"][positions] = scores
+        self.columns["risk_band"][positions] = [band.encode("ascii") for band in bands]
+        self.columns["scorecard_version"][positions] = [scorecard or 0 for scorecard in scorecards]
+        self.columns["version"][positions] = versions
+        self.columns["updated_at"][positions] = numpy.array([_micros(value) for value in updated], dtype="<i8").view("<M8[us]")
+
+        features = [row if isinstance(row, dict) else {} for row in features]
+        names = dict.fromkeys(name for row in features for name in row)
+        for name in names:
+            values = numpy.fromiter(
+                (_number(row.get(name)) for row in features), dtype=numpy.float64, count=count
+            )
+            self.column(FEATURE_PREFIX + name)[positions] = values
+        # Rows are rewritten whole: clear features these rows no longer have
+        for name, array in self.columns.items():
+            if name.startswith(FEATURE_PREFIX) and name[len(FEATURE_PREFIX):] not in names:
+                array[positions] = numpy.nan
+
+    def finish(self, manifest: Dict) -> Dict:
+        if not self.filled.all():
+            self._compact()
+        for array in self.columns.values():
+            array.flush()
+        ordered = list(COLUMNS) + sorted(name for name in self.columns if name not in COLUMNS)
+        manifest = {
+            **manifest,
+            "format": FORMAT,
+            "generation": self.generation,
+            "rows": self.rows,
+            "columns": {name: {"file": self._file(name), "dtype": self.dtypes[name]} for name in ordered},
+        }
+        temporary = self.directory / f"{MANIFEST}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(temporary, self.directory / MANIFEST)
+        self.columns.clear()
+        _remove_unreferenced(self.directory, manifest)
+        return manifest
+
+
+def _number(value) -> float:
+    if value is None or isinstance(value, (dict, list, str)):
+        return numpy.nan
+    return float(value)
+
+
+def _remove_unreferenced(directory: Path, manifest: Dict) -> None:
+    keep = {column["file"] for column in manifest["columns"].values()}
+    for path in directory.glob("*.npy"):
+        if path.name not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                # Still mapped by a reader on a platform that won't unlink
+                # open files; the next export retries
+                pass
+
+
+def export_snapshot(directory=None, chunk_size: int = 5000) -> Dict[str, int]:
+    """Write a complete new snapshot generation of every credit profile."""
+    _require_numpy()
+    directory = Path(directory or settings.FEATURE_SNAPSHOT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(directory)
+    as_of = timezone.now()
+
+    ids = _live_ids(chunk_size)
+    writer = _Writer(directory, (previous["generation"] + 1) if previous else 1, len(ids))
+    written = 0
+    for chunk in _rows(CreditProfile.objects.filter(pk__lte=int(ids[-1]) if len(ids) else 0), chunk_size):
+        positions, chunk = _place(ids, chunk)
+        writer.write(positions, chunk)
+        written += len(chunk)
+    writer.finish(_manifest_times(previous, as_of, full=True))
+    return {"rows": len(ids), "read": written, "copied": 0, "removed": 0, "generation": writer.generation, "full": True}
+
+
+def refresh_snapshot(directory=None, chunk_size: int = 5000, settle_seconds: Optional[int] = None) -> Dict[str, int]:
+    """Bring a snapshot up to date, reading only profiles changed since it was taken.
+
+    Profiles updated since the previous run (less ``settle_seconds``,
+    default ``CHANGE_TRACKING_SETTLE_SECONDS``, for writes that commit
+    after their timestamp) and profiles the snapshot doesn't have yet are
+    read from the database; every other row is copied from the previous
+    generation, and deleted profiles are dropped. Without a previous
+    snapshot this is :func:`export_snapshot`.
+    """
+    _require_numpy()
+    directory = Path(directory or settings.FEATURE_SNAPSHOT_DIR)
+    previous = _read_manifest(directory)
+    if previous is None:
+        return export_snapshot(directory, chunk_size)
+    settle_seconds = settings.CHANGE_TRACKING_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+    since = parse_datetime(previous["as_of"]) - timedelta(seconds=settle_seconds)
+    as_of = timezone.now()
+
+    source = load_snapshot(directory)
+    old_ids = numpy.asarray(source["profile_id"])
+    ids = _live_ids(chunk_size)
+    writer = _Writer(directory, previous["generation"] + 1, len(ids))
+
+    # Rows of the old generation that still exist, and where they land
+    kept = _members(old_ids, ids)
+    positions = numpy.searchsorted(ids, old_ids[kept])
+    writer.copy(source, numpy.flatnonzero(kept), positions)
+    stats = {
+        "rows": len(ids),
+        "read": 0,
+        "copied": int(kept.sum()),
+        "removed": int(len(old_ids) - kept.sum()),
+        "generation": writer.generation,
+        "full": False,
+    }
+
+    changed = CreditProfile.objects.filter(updated_at__gte=since)
+    for chunk in _rows(changed, chunk_size):
+        positions, chunk = _place(ids, chunk)
+        writer.write(positions, chunk)
+        stats["read"] += len(chunk)
+    # New ids whose updated_at predates the window (e.g. committed late)
+    missing = ids[~_members(ids, old_ids)]
+    for start in range(0, len(missing), chunk_size):
+        chunk = list(CreditProfile.objects.filter(pk__in=missing[start:start + chunk_size].tolist(), updated_at__lt=since).values_list(*_FIELDS))
+        positions, chunk = _place(ids, chunk)
+        writer.write(positions, chunk)
+        stats["read"] += len(chunk)
+
+    del source
+    writer.finish(_manifest_times(previous, as_of, full=False))
+    return stats
+
+
+def _live_ids(chunk_size: int) -> "numpy.ndarray":
+    """Every profile id, ascending; the row order of the new generation."""
+    return numpy.fromiter(
+        CreditProfile.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=chunk_size),
+        dtype=numpy.int64,
+    )
+
+
+def _members(values: "numpy.ndarray", sorted_ids: "numpy.ndarray") -> "numpy.ndarray":
+    """Boolean mask of ``values`` present in the ascending ``sorted_ids``."""
+    if not len(sorted_ids):
+        return numpy.zeros(len(values), dtype=bool)
+    index = numpy.minimum(numpy.searchsorted(sorted_ids, values), len(sorted_ids) - 1)
+    return sorted_ids[index] == values
+
+
+def _place(ids: "numpy.ndarray", chunk: Iterable[tuple]):
+    """Positions of ``chunk``'s rows in ``ids``, dropping rows created after ``ids`` was read."""
+    chunk = list(chunk)
+    if not chunk:
+        return numpy.zeros(0, dtype=numpy.int64), chunk
+    row_ids = numpy.fromiter((row[0] for row in chunk), dtype=numpy.int64, count=len(chunk))
+    present = _members(row_ids, ids)
+    if not present.all():
+        chunk = [row for row, keep in zip(chunk, present) if keep]
+        row_ids = row_ids[present]
+    return numpy.searchsorted(ids, row_ids), chunk
+
+
+def _manifest_times(previous: Optional[Dict], as_of: datetime, full: bool) -> Dict:
+    created = as_of.isoformat() if full or previous is None else previous["created_at"]
+    return {"created_at": created, "as_of": as_of.isoformat()}
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from django.core.cache import cache
+
+
+# Counters exposed by GET /api/metrics/. Values live in the configured Django
+# cache so every worker sharing that cache reports into the same totals.
+COUNTERS = (
+    "credit_profile.writes_applied",
+    "credit_profile.writes_skipped",
+    "credit_profile.write_conflicts",
+    "credit_profile.writes_deferred",
+    "api_cache.hits",
+    "api_cache.misses",
+    "db.lock_retries",
+)
+
+_KEY_PREFIX = "metrics:"
+
+
+def increment(name: str, amount: int = 1) -> None:
+    key = _KEY_PREFIX + name
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # First hit since the cache was cleared; add() keeps concurrent
+        # initialisations from clobbering each other.
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, amount)
+
+
+def get_counters() -> Dict[str, int]:
+    values = cache.get_many([_KEY_PREFIX + name for name in COUNTERS])
+    return {name: values.get(_KEY_PREFIX + name, 0) for name in COUNTERS}
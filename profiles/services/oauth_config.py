@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from django.conf import settings
+
+
+# site id -> whether Google login is usable there. Filled on first use (or by
+# sync_google_app / profiles.startup.warm_up) and cleared by the SocialApp
+# signals in social_signals.py, so the login and register pages never read
+# .env or the database for it.
+_google_enabled: Dict[int, bool] = {}
+
+
+def invalidate() -> None:
+    _google_enabled.clear()
+
+
+def sync_google_app(site=None):
+    """Create or update the Google SocialApp from settings and link it to ``site``.
+
+    Returns the app, or None when no credentials are configured. Meant for
+    deploy time (migrate, setup_google_oauth), not for request handling.
+    """
+    from allauth.socialaccount.models import SocialApp
+    from django.contrib.sites.models import Site
+
+    client_id = settings.GOOGLE_CLIENT_ID
+    secret = settings.GOOGLE_CLIENT_SECRET
+    if not client_id or not secret:
+        return None
+    site = site or Site.objects.get_current()
+    app, created = SocialApp.objects.get_or_create(
+        provider="google",
+        defaults={"name": "Google", "client_id": client_id, "secret": secret},
+    )
+    if not created and (app.client_id != client_id or app.secret != secret):
+        app.client_id = client_id
+        app.secret = secret
+        app.save(update_fields=["client_id", "secret"])
+    if not app.sites.filter(pk=site.pk).exists():
+        app.sites.add(site)
+    invalidate()
+    _google_enabled[site.pk] = True
+    return app
+
+
+def sync_after_migrate(sender, using="default", **kwargs):
+    """post_migrate hook: keep the SocialApp in step with settings on every deploy."""
+    from django.contrib.sites.models import Site
+
+    try:
+        site = Site.objects.using(using).get(pk=settings.SITE_ID)
+    except Site.DoesNotExist:
+        return
+    sync_google_app(site)
+
+
+def google_enabled(site_id: Optional[int] = None) -> bool:
+    site_id = site_id or settings.SITE_ID
+    enabled = _google_enabled.get(site_id)
+    if enabled is None:
+        from allauth.socialaccount.models import SocialApp
+
+        enabled = (
+            SocialApp.objects.filter(provider="google", sites=site_id)
+            .exclude(client_id="")
+            .exclude(secret="")
+            .exists()
+        )
+        _google_enabled[site_id] = enabled
+    return enabled
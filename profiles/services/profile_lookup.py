@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import connections
+
+from ..models import CreditProfile
+
+
+def _chunks(values: List, size: int) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _batch_size(keys: List) -> int:
+    # Postgres takes the whole list at once; SQLite caps bound parameters
+    return connections[CreditProfile.objects.db].features.max_query_params or len(keys)
+
+
+def _fetch(lookup: str, keys: List, fields: List[str], key_field: str) -> Dict:
+    """Fetch profiles whose ``lookup`` is in ``keys`` with one IN query per backend-sized batch."""
+    if not keys:
+        return {}
+    found = {}
+    for chunk in _chunks(keys, _batch_size(keys)):
+        for row in CreditProfile.objects.filter(**{f"{lookup}__in": chunk}).values(*fields):
+            found[row.pop(key_field)] = row
+    return found
+
+
+async def _afetch(lookup: str, keys: List, fields: List[str], key_field: str) -> Dict:
+    if not keys:
+        return {}
+    found = {}
+    for chunk in _chunks(keys, _batch_size(keys)):
+        async for row in CreditProfile.objects.filter(**{f"{lookup}__in": chunk}).values(*fields):
+            found[row.pop(key_field)] = row
+    return found
+
+
+def _parse(keys: List[str]) -> Tuple[List[Tuple], List, List]:
+    by_id_keys, by_email_keys = {}, {}
+    parsed = []
+    for key in keys:
+        key = key.strip()
+        try:
+            customer_id = uuid.UUID(key)
+        except ValueError:
+            customer_id = None
+        if customer_id is not None:
+            by_id_keys[customer_id] = None
+            parsed.append((key, "id", customer_id))
+        elif "@" in key:
+            by_email_keys[key] = None
+            parsed.append((key, "email", key))
+        else:
+            parsed.append((key, None, None))
+    return parsed, list(by_id_keys), list(by_email_keys)
+
+
+def _fields(include_features: bool) -> List[str]:
+    return ["score", "risk_band", "scorecard_version", "updated_at"] + (["features"] if include_features else [])
+
+
+def _assemble(parsed: List[Tuple], by_id: Dict, by_email: Dict, fields: List[str]) -> List[Dict]:
+    results = []
+    for key, kind, value in parsed:
+        if kind is None:
+            results.append({"key": key, "found": False, "error": "invalid_key"})
+            continue
+        row = by_id.get(value) if kind == "id" else by_email.get(value)
+        if row is None:
+            results.append({"key": key, "found": False, "error": "not_found"})
+            continue
+        entry = {"key": key, "found": True, "customer_id": value if kind == "id" else row["customer_id"]}
+        entry.update((name, row[name]) for name in fields)
+        results.append(entry)
+    return results
+
+
+def lookup_credit_profiles(keys: List[str], include_features: bool = False) -> List[Dict]:
+    """Resolve customer ids and/or emails to credit profiles, preserving request order.
+
+    Every key gets an entry: either the profile summary or ``found: False``
+    with the reason, so callers can zip results back onto their input.
+    """
+    parsed, id_keys, email_keys = _parse(keys)
+    fields = _fields(include_features)
+    by_id = _fetch("customer_id", id_keys, ["customer_id"] + fields, "customer_id")
+    by_email = _fetch("customer__email", email_keys, ["customer_id", "customer__email"] + fields, "customer__email")
+    return _assemble(parsed, by_id, by_email, fields)
+
+
+async def alookup_credit_profiles(keys: List[str], include_features: bool = False) -> List[Dict]:
+    """Async :func:`lookup_credit_profiles`."""
+    parsed, id_keys, email_keys = _parse(keys)
+    fields = _fields(include_features)
+    by_id = await _afetch("customer_id", id_keys, ["customer_id"] + fields, "customer_id")
+    by_email = await _afetch("customer__email", email_keys, ["customer_id", "customer__email"] + fields, "customer__email")
+    return _assemble(parsed, by_id, by_email, fields)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from django.db import connections, router, transaction
+from django.db.models import Case, CharField, F, IntegerField, QuerySet, Value, When
+from django.utils import timezone
+
+from ..caching import bump_version
+from ..models import CreditProfile, CreditScoreHistory
+from ..utils import log_activity
+from .metrics import increment
+from .scorecards import ScorecardError, active_scorecard, scorecard_version
+
+
+def rescore_from_features(
+    queryset: Optional[QuerySet] = None,
+    version: Optional[int] = None,
+    chunk_size: int = 2000,
+    dry_run: bool = False,
+    request=None,
+) -> Dict[str, int]:
+    """Re-apply a scorecard to the features already stored on credit profiles.
+
+    Orders and payments are not read. Profiles are streamed in primary-key
+    chunks and scored in one ``score_many`` call per chunk; only rows whose
+    score, band or scorecard version moved are written, one transaction per
+    chunk: one UPDATE, guarded on each row's ``version`` like the
+    compare-and-swap in ``compute_and_persist_credit_profile``, plus
+    bulk-created history rows. Nothing is locked up front; a profile
+    rewritten since the chunk was read already holds a fresher score, so it
+    is left alone and counted in ``conflicts``. The per-row CreditProfile
+    signals are skipped, so list caches are invalidated here and a single
+    summary ActivityLog entry replaces the per-profile ones.
+
+    Profiles whose stored features lack an input the scorecard uses are
+    left alone and counted as ``missing_features``; a full recompute
+    fills them in. ``version`` defaults to the active scorecard; another
+    version can only be previewed with ``dry_run``.
+    """
+    active = active_scorecard()
+    scorecard = active if version is None else scorecard_version(version)
+    if scorecard is None:
+        raise ScorecardError(f"Scorecard v{version} does not exist")
+    if scorecard.version != active.version and not dry_run:
+        raise ScorecardError(f"Scorecard v{scorecard.version} is not active; activate it first or use a dry run")
+
+    queryset = (queryset if queryset is not None else CreditProfile.objects.all()).only(
+        "id", "customer_id", "score", "risk_band", "features", "scorecard_version", "version"
+    )
+    stats = {"scanned": 0, "changed": 0, "band_changes": 0, "version_only": 0, "missing_features": 0, "conflicts": 0}
+    last_pk = None
+    while True:
+        chunk_qs = queryset.order_by("pk")
+        if last_pk is not None:
+            chunk_qs = chunk_qs.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        stats["scanned"] += len(chunk)
+
+        scorable = []
+        for profile in chunk:
+            features = profile.features if isinstance(profile.features, dict) else {}
+            if all(name in features for name in scorecard.features):
+                scorable.append(profile)
+            else:
+                stats["missing_features"] += 1
+
+        now = timezone.now()
+        changed = []
+        for profile, (score, band) in zip(scorable, scorecard.score_many([p.features for p in scorable])):
+            if (profile.score, profile.risk_band) == (score, band) and profile.scorecard_version == scorecard.version:
+                continue
+            changed.append((profile, score, band))
+        if dry_run:
+            _count_changes(stats, changed)
+            continue
+
+        with transaction.atomic():
+            applied = _write_unchanged(changed, scorecard.version, now)
+            CreditScoreHistory.objects.bulk_create([
+                CreditScoreHistory(customer_id=profile.customer_id, score=score, risk_band=band, created_at=now)
+                for profile, score, band in applied
+                if (profile.score, profile.risk_band) != (score, band)
+            ])
+        stats["conflicts"] += len(changed) - len(applied)
+        _count_changes(stats, applied)
+        if applied:
+            increment("credit_profile.writes_applied", len(applied))
+        if len(applied) < len(changed):
+            increment("credit_profile.write_conflicts", len(changed) - len(applied))
+
+    if not dry_run:
+        if stats["changed"]:
+            transaction.on_commit(lambda: bump_version(CreditProfile))
+        log_activity(
+            action="score_recomputed",
+            description=(
+                f"Rescored {stats['scanned']} credit profiles from stored features with scorecard "
+                f"v{scorecard.version}: {stats['changed']} updated, {stats['band_changes']} band changes"
+            ),
+            metadata={"scorecard_version": scorecard.version, **stats},
+            request=request,
+        )
+    return stats
+
+
+def _write_unchanged(changed, scorecard_version: int, now) -> List:
+    """Write the ``(profile, score, band)`` rows whose version is still the one read; returns those written.
+
+    Each UPDATE carries per-row scores, bands and expected versions as CASE
+    expressions, so a batch is one statement however many rows it holds.
+    """
+    if not changed:
+        return []
+    using = router.db_for_write(CreditProfile)
+    # pk is bound in the IN list and in three CASEs, plus the three values
+    size = max(1, connections[using].ops.bulk_batch_size(["pk"] * 7, changed))
+    written = 0
+    for start in range(0, len(changed), size):
+        batch = changed[start:start + size]
+
+        def per_row(value, output_field):
+            return Case(*(When(pk=entry[0].pk, then=Value(value(entry))) for entry in batch), output_field=output_field)
+
+        written += CreditProfile.objects.using(using).filter(
+            pk__in=[profile.pk for profile, _, _ in batch],
+            version=per_row(lambda entry: entry[0].version, IntegerField()),
+        ).update(
+            score=per_row(lambda entry: entry[1], IntegerField()),
+            risk_band=per_row(lambda entry: entry[2], CharField()),
+            scorecard_version=scorecard_version,
+            updated_at=now,
+            version=F("version") + 1,
+        )
+    if written == len(changed):
+        return changed
+    # Some rows were rewritten since they were read; ours carry this run's timestamp
+    current = {
+        pk: (version, updated_at)
+        for pk, version, updated_at in CreditProfile.objects.using(using)
+        .filter(pk__in=[profile.pk for profile, _, _ in changed])
+        .values_list("pk", "version", "updated_at")
+    }
+    return [entry for entry in changed if current.get(entry[0].pk) == (entry[0].version + 1, now)]
+
+
+def _count_changes(stats: Dict[str, int], changes) -> None:
+    for profile, score, band in changes:
+        stats["changed"] += 1
+        if (profile.score, profile.risk_band) == (score, band):
+            stats["version_only"] += 1
+        else:
+            stats["band_changes"] += profile.risk_band != band
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from ..models import CreditScoreHistory
+
+
+BUCKETS = ("raw", "daily", "weekly")
+
+
+def _bucket_start(ts: datetime, bucket: str) -> date:
+    day = timezone.localdate(ts)
+    if bucket == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def downsample(points: Iterable[Tuple[datetime, int, str]], bucket: str) -> List[Dict]:
+    """Fold time-ordered (timestamp, score, band) points into daily/weekly buckets.
+
+    Each bucket reports the score in effect at its end (``score``), the first
+    score recorded in it and the range seen within it, so a chart keeps its
+    shape at a fraction of the payload.
+    """
+    if bucket == "raw":
+        return [{"created_at": ts, "score": score, "risk_band": band} for ts, score, band in points]
+
+    buckets: List[Dict] = []
+    current: Optional[Dict] = None
+    for ts, score, band in points:
+        start = _bucket_start(ts, bucket)
+        if current is None or current["period_start"] != start:
+            current = {
+                "period_start": start,
+                "open_score": score,
+                "score": score,
+                "risk_band": band,
+                "min_score": score,
+                "max_score": score,
+                "changes": 0,
+            }
+            buckets.append(current)
+        current["score"] = score
+        current["risk_band"] = band
+        current["min_score"] = min(current["min_score"], score)
+        current["max_score"] = max(current["max_score"], score)
+        current["changes"] += 1
+    return buckets
+
+
+def get_score_history(customer_id, bucket: str = "daily", since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict:
+    history = CreditScoreHistory.objects.filter(customer_id=customer_id)
+    if since is not None:
+        history = history.filter(created_at__gte=since)
+    if until is not None:
+        history = history.filter(created_at__lt=until)
+    points = history.order_by("created_at").values_list("created_at", "score", "risk_band").iterator()
+
+    series = downsample(points, bucket)
+    trend = None
+    if series:
+        first = series[0].get("open_score", series[0]["score"])
+        last = series[-1]["score"]
+        trend = {"first_score": first, "last_score": last, "change": last - first}
+    return {"customer_id": customer_id, "bucket": bucket, "trend": trend, "points": series}
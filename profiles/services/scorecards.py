@@ -0,0 +1,300 @@
+"""Versioned scorecards: rule definitions stored as data, compiled to Python.
+
+A definition is a JSON object::
+
+    {
+        "base": 600,
+        "min_score": 300,
+        "max_score": 1000,
+        "terms": [
+            {"feature": "total_spend", "divide_by": 100, "cap": 200},
+            {"feature": "return_rate", "clip": 1, "multiply_by": -300},
+            {"feature": "uses_cod", "at_least": 1, "points": -50}
+        ],
+        "bands": [["A", 800], ["B", 700], ["C", 600], ["D", 500], ["E", null]]
+    }
+
+A linear term adds ``int(min(value, clip) * multiply_by)`` (or ``/ divide_by``),
+bounded by ``cap``/``floor`` when given; a step term adds ``points`` when
+the feature is ``>= at_least``. Missing features count as 0. Bands are
+checked top to bottom and the last one, without a threshold, catches the
+rest.
+
+Each definition is validated and compiled once per process into a scalar
+function and, when numpy is installed, a vectorized one over many feature
+dicts; both produce identical scores.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import numpy
+except ImportError:  # Optional accelerator for score_many; the scalar path is always available
+    numpy = None
+
+
+# The hand-written scorecard the project started with. Used as version 1
+# and whenever no scorecard is marked active.
+DEFAULT_VERSION = 1
+DEFAULT_DEFINITION = {
+    "base": 600,
+    "min_score": 300,
+    "max_score": 1000,
+    "terms": [
+        {"feature": "total_spend", "divide_by": 100, "cap": 200},
+        {"feature": "delivered_orders", "multiply_by": 2, "cap": 100},
+        {"feature": "avg_order_value", "divide_by": 10, "cap": 80},
+        {"feature": "return_rate", "clip": 1, "multiply_by": -300},
+        {"feature": "failed_payment_rate", "clip": 1, "multiply_by": -200},
+        {"feature": "uses_cod", "at_least": 1, "points": -50},
+    ],
+    "bands": [["A", 800], ["B", 700], ["C", 600], ["D", 500], ["E", None]],
+}
+
+_ACTIVE_CACHE_KEY = "scorecard:active"
+FEATURE_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+# Largest magnitude accepted for any number in a definition (and for
+# simulated feature values), so term points stay well inside int64
+MAX_MAGNITUDE = 1e9
+_LINEAR_KEYS = {"feature", "multiply_by", "divide_by", "clip", "cap", "floor"}
+_STEP_KEYS = {"feature", "at_least", "points"}
+
+
+class ScorecardError(ValueError):
+    pass
+
+
+def _number(value, where: str, integer: bool = False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ScorecardError(f"{where} must be a number")
+    if abs(value) > MAX_MAGNITUDE:
+        raise ScorecardError(f"{where} must be between -{MAX_MAGNITUDE:g} and {MAX_MAGNITUDE:g}")
+    if integer and value != int(value):
+        raise ScorecardError(f"{where} must be a whole number")
+    return int(value) if integer else float(value)
+
+
+def validate_definition(definition) -> Dict:
+    """Check ``definition`` and return it normalized; raises ScorecardError."""
+    from ..models import CreditProfile
+
+    if not isinstance(definition, Mapping):
+        raise ScorecardError("definition must be an object")
+    unknown = set(definition) - {"base", "min_score", "max_score", "terms", "bands"}
+    if unknown:
+        raise ScorecardError(f"unknown keys: {', '.join(sorted(unknown))}")
+    base = _number(definition.get("base"), "base", integer=True)
+    min_score = _number(definition.get("min_score"), "min_score", integer=True)
+    max_score = _number(definition.get("max_score"), "max_score", integer=True)
+    if min_score > max_score:
+        raise ScorecardError("min_score is above max_score")
+
+    terms = []
+    for index, term in enumerate(definition.get("terms") or []):
+        where = f"terms[{index}]"
+        if not isinstance(term, Mapping) or not FEATURE_NAME.match(str(term.get("feature", ""))):
+            raise ScorecardError(f"{where} needs a lowercase identifier as 'feature'")
+        if "points" in term:
+            if set(term) - _STEP_KEYS or "at_least" not in term:
+                raise ScorecardError(f"{where}: a step term takes exactly feature, at_least and points")
+            terms.append({
+                "feature": term["feature"],
+                "at_least": _number(term["at_least"], f"{where}.at_least"),
+                "points": _number(term["points"], f"{where}.points", integer=True),
+            })
+            continue
+        if set(term) - _LINEAR_KEYS:
+            raise ScorecardError(f"{where}: unknown keys {', '.join(sorted(set(term) - _LINEAR_KEYS))}")
+        if ("multiply_by" in term) == ("divide_by" in term):
+            raise ScorecardError(f"{where} needs one of multiply_by or divide_by")
+        normalized = {"feature": term["feature"]}
+        for key in ("multiply_by", "divide_by", "clip"):
+            if key in term:
+                normalized[key] = _number(term[key], f"{where}.{key}")
+        if normalized.get("divide_by") == 0:
+            raise ScorecardError(f"{where}.divide_by must not be 0")
+        for key in ("cap", "floor"):
+            if key in term:
+                normalized[key] = _number(term[key], f"{where}.{key}", integer=True)
+        terms.append(normalized)
+
+    bands = definition.get("bands")
+    if not isinstance(bands, list) or not bands:
+        raise ScorecardError("bands must be a non-empty list of [band, min_score]")
+    valid_bands = {code for code, _ in CreditProfile.BAND_CHOICES}
+    normalized_bands = []
+    previous = math.inf
+    for index, entry in enumerate(bands):
+        if not isinstance(entry, (list, tuple)) or len(entry) != 2 or entry[0] not in valid_bands:
+            raise ScorecardError(f"bands[{index}] must be [band, min_score] with band one of {''.join(sorted(valid_bands))}")
+        code, threshold = entry
+        if index == len(bands) - 1:
+            if threshold is not None:
+                raise ScorecardError("the last band catches the rest and takes null as its threshold")
+        elif threshold is None:
+            raise ScorecardError(f"bands[{index}] needs a threshold")
+        else:
+            threshold = _number(threshold, f"bands[{index}][1]", integer=True)
+            if threshold >= previous:
+                raise ScorecardError("band thresholds must be strictly decreasing")
+            previous = threshold
+        normalized_bands.append([code, threshold])
+
+    return {"base": base, "min_score": min_score, "max_score": max_score, "terms": terms, "bands": normalized_bands}
+
+
+def _term_source(term: Dict, np: bool) -> str:
+    """Python expression for one term's points; ``np`` selects the array form."""
+    value = f"f[{term['feature']!r}]" if np else f"get({term['feature']!r}, 0)"
+    if "points" in term:
+        if np:
+            return f"numpy.where({value} >= {term['at_least']!r}, {term['points']!r}, 0)"
+        return f"({term['points']!r} if {value} >= {term['at_least']!r} else 0)"
+    if "clip" in term:
+        value = f"numpy.minimum({value}, {term['clip']!r})" if np else f"min({value}, {term['clip']!r})"
+    if "multiply_by" in term:
+        value = f"{value} * {term['multiply_by']!r}"
+    else:
+        value = f"{value} / {term['divide_by']!r}"
+    points = f"numpy.trunc({value}).astype(numpy.int64)" if np else f"int({value})"
+    if "cap" in term:
+        points = f"numpy.minimum({points}, {term['cap']!r})" if np else f"min({points}, {term['cap']!r})"
+    if "floor" in term:
+        points = f"numpy.maximum({points}, {term['floor']!r})" if np else f"max({points}, {term['floor']!r})"
+    return points
+
+
+def _compile(source: str, name: str, version: int) -> Callable:
+    namespace = {"numpy": numpy}
+    exec(compile(source, f"<scorecard v{version}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _compile_scalar(definition: Dict, version: int) -> Callable[[Mapping], Tuple[int, str]]:
+    lines = ["def evaluate(features):", "    get = features.get", f"    score = {definition['base']!r}"]
+    lines += [f"    score += {_term_source(term, np=False)}" for term in definition["terms"]]
+    lines.append(f"    score = max({definition['min_score']!r}, min({definition['max_score']!r}, score))")
+    for code, threshold in definition["bands"]:
+        if threshold is None:
+            lines.append(f"    return score, {code!r}")
+        else:
+            lines.append(f"    if score >= {threshold!r}:")
+            lines.append(f"        return score, {code!r}")
+    return _compile("\n".join(lines), "evaluate", version)
+
+
+def _compile_vector(definition: Dict, version: int) -> Callable[[Dict[str, "numpy.ndarray"], int], "numpy.ndarray"]:
+    lines = ["def evaluate_many(f, n):", f"    score = numpy.full(n, {definition['base']!r}, dtype=numpy.int64)"]
+    lines += [f"    score += {_term_source(term, np=True)}" for term in definition["terms"]]
+    lines.append(f"    return numpy.clip(score, {definition['min_score']!r}, {definition['max_score']!r})")
+    return _compile("\n".join(lines), "evaluate_many", version)
+
+
+class CompiledScorecard:
+    """One scorecard version, ready to score feature dicts."""
+
+    def __init__(self, version: int, definition):
+        self.version = version
+        self.definition = validate_definition(definition)
+        self.features = tuple(dict.fromkeys(term["feature"] for term in self.definition["terms"]))
+        self.score = _compile_scalar(self.definition, version)
+        self._score_many = _compile_vector(self.definition, version) if numpy is not None else None
+        self._bands = self.definition["bands"]
+
+    def __repr__(self) -> str:
+        return f"<CompiledScorecard v{self.version}>"
+
+    def score_many(self, rows: Sequence[Mapping]) -> List[Tuple[int, str]]:
+        """Score many feature dicts at once; same results as ``score`` on each."""
+        if self._score_many is None or not rows:
+            return [self.score(row) for row in rows]
+        count = len(rows)
+        columns = {
+            name: numpy.fromiter((row.get(name, 0) for row in rows), dtype=numpy.float64, count=count)
+            for name in self.features
+        }
+        scores, bands = self.score_columns(columns, count)
+        return list(zip(scores.tolist(), bands.tolist()))
+
+    def score_columns(self, columns: Mapping[str, "numpy.ndarray"], count: int) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+        """Scores and band codes for ``count`` rows given as one float array per feature; needs numpy.
+
+        Every name in ``features`` must be present; use 0 for missing values.
+        """
+        if self._score_many is None:
+            raise ScorecardError("Scoring columns needs numpy")
+        scores = self._score_many(columns, count)
+        labels = numpy.array([code for code, _ in self._bands])
+        thresholds = numpy.array([threshold for _, threshold in self._bands[:-1]], dtype=numpy.int64)
+        # Band index = number of thresholds the score falls below
+        band_index = (scores[:, None] < thresholds[None, :]).sum(axis=1) if len(thresholds) else numpy.zeros(count, dtype=int)
+        return scores, labels[band_index]
+
+
+# (version, definition digest) -> compiled scorecard. Definitions are
+# immutable per version; the digest only guards against in-place edits.
+_compiled: Dict[Tuple[int, str], CompiledScorecard] = {}
+
+
+def get_compiled(version: int, definition) -> CompiledScorecard:
+    digest = hashlib.sha1(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+    compiled = _compiled.get((version, digest))
+    if compiled is None:
+        compiled = _compiled[(version, digest)] = CompiledScorecard(version, definition)
+    return compiled
+
+
+def invalidate_active() -> None:
+    cache.delete(_ACTIVE_CACHE_KEY)
+
+
+def active_scorecard() -> CompiledScorecard:
+    """The scorecard new scores are computed with.
+
+    The active version and definition are cached for
+    ``SCORECARD_CACHE_SECONDS`` and dropped whenever a Scorecard is saved,
+    so scoring doesn't query for them on every recompute.
+    """
+    from ..models import Scorecard
+
+    active = cache.get(_ACTIVE_CACHE_KEY)
+    if active is None:
+        row = Scorecard.objects.filter(is_active=True).values("version", "definition").first()
+        active = (row["version"], row["definition"]) if row else (DEFAULT_VERSION, DEFAULT_DEFINITION)
+        cache.set(_ACTIVE_CACHE_KEY, active, settings.SCORECARD_CACHE_SECONDS)
+    return get_compiled(*active)
+
+
+def activate_scorecard(version: int):
+    """Make ``version`` the active scorecard. Existing profiles keep their scores until rescored."""
+    from django.db import transaction
+
+    from ..models import Scorecard
+
+    with transaction.atomic():
+        scorecard = Scorecard.objects.select_for_update().get(version=version)
+        scorecard.full_clean()
+        Scorecard.objects.filter(is_active=True).exclude(pk=scorecard.pk).update(is_active=False)
+        if not scorecard.is_active:
+            scorecard.is_active = True
+            scorecard.save(update_fields=["is_active"])
+    invalidate_active()
+    return scorecard
+
+
+def scorecard_version(version: int) -> Optional[CompiledScorecard]:
+    """A specific stored version, e.g. to rescore profiles against a candidate before activating it."""
+    from ..models import Scorecard
+
+    if version == DEFAULT_VERSION and not Scorecard.objects.filter(version=version).exists():
+        return get_compiled(DEFAULT_VERSION, DEFAULT_DEFINITION)
+    row = Scorecard.objects.filter(version=version).values("definition").first()
+    return get_compiled(version, row["definition"]) if row else None
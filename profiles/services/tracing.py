@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import connection
+
+
+# Marker stored in the context while inside a root span that lost the sampling
+# roll, so nested spans skip their bookkeeping without re-rolling.
+_UNSAMPLED = object()
+
+_current_span: ContextVar[Any] = ContextVar("scoring_trace_span", default=None)
+_trace_logger: Optional[logging.Logger] = None
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attrs", "start", "duration_ms", "queries", "error", "records")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration_ms = 0.0
+        self.queries = 0
+        self.error = False
+        # Finished spans of the whole trace, shared with every descendant
+        self.records: List[Dict[str, Any]] = parent.records if parent else []
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def as_record(self) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "queries": self.queries,
+            "error": self.error,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        return record
+
+
+def _get_trace_logger() -> logging.Logger:
+    global _trace_logger
+    if _trace_logger is None:
+        path = Path(settings.SCORING_TRACE_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SCORING_TRACE_MAX_BYTES,
+            backupCount=settings.SCORING_TRACE_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("profiles.tracing")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _trace_logger = logger
+    return _trace_logger
+
+
+def _write_trace(records: List[Dict[str, Any]]) -> None:
+    try:
+        logger = _get_trace_logger()
+        for record in records:
+            logger.info(json.dumps(record, separators=(",", ":"), default=str))
+    except Exception:
+        pass  # Tracing must never break scoring
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a (possibly nested) span of the current trace.
+
+    The sampling decision is taken once by the outermost span; unsampled traces
+    cost a context variable lookup per span and nothing else.
+    """
+    parent = _current_span.get()
+    if parent is _UNSAMPLED:
+        yield None
+        return
+    if parent is None:
+        if not settings.SCORING_TRACE_ENABLED or random.random() >= settings.SCORING_TRACE_SAMPLE_RATE:
+            token = _current_span.set(_UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _current_span.reset(token)
+            return
+
+    current = Span(name, parent, attrs)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(current._count_query):
+            yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000.0
+        _current_span.reset(token)
+        current.records.append(current.as_record())
+        if parent is None:
+            _write_trace(current.records)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of :func:`span` for signal handlers and service functions."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,37 +1,88 @@
-from django.db.models.signals import post_save, post_init
+from django.db.models.signals import post_delete, post_save, post_init
 from django.dispatch import receiver
 from django.db import transaction
 
-from .models import Order, Payment, CreditProfile
-from .services.credit_scoring import compute_and_persist_credit_profile
+from .caching import bump_version
+from .models import Customer, Order, Payment, CreditProfile, CreditScoreHistory, Scorecard
+from .services import change_tracking, daily_activity, scorecards
+from .services.tracing import span, traced
 from .utils import log_activity
 
 
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=Payment)
+def remember_rollup_state(sender, instance, **kwargs):
+    # What the row contributes to CustomerDailyActivity as loaded, so a save
+    # can move exactly that contribution
+    if instance.pk is None:
+        instance._rollup_state = None
+    elif sender is Order:
+        instance._rollup_state = daily_activity.order_state(instance)
+    else:
+        instance._rollup_state = daily_activity.payment_state(instance)
+
+
+def _sync_daily_activity(instance, created: bool) -> None:
+    if isinstance(instance, Order):
+        new, record = daily_activity.order_state(instance), daily_activity.record_order_change
+    else:
+        new, record = daily_activity.payment_state(instance), daily_activity.record_payment_change
+    old = None if created else getattr(instance, "_rollup_state", None)
+    with span("signal.daily_activity"):
+        if new is None or (old is None and not created):
+            # Saved from a partially loaded instance: recount this customer
+            daily_activity.rebuild_daily_activity([instance.customer_id])
+        else:
+            record(old, new)
+    instance._rollup_state = new
+
+
 @receiver(post_save, sender=Order)
+@receiver(post_save, sender=Payment)
+def track_changed_customer(sender, instance, created: bool, **kwargs):
+    # Connected before the recompute receivers so _rollup_state still holds
+    # the loaded row: an order moved between customers dirties both
+    previous = None if created else getattr(instance, "_rollup_state", None)
+    change_tracking.mark_dirty(
+        [instance.customer_id, previous[0] if previous else None],
+        "order" if sender is Order else "payment",
+    )
+
+
+@receiver(post_save, sender=Order)
+@traced("signal.recompute_on_order")
 def recompute_on_order(sender, instance: Order, created: bool, **kwargs):
+    # Buckets first: the recompute below reads its features from them
+    _sync_daily_activity(instance, created)
+
     # Log activity
     action = "order_created" if created else "order_status_changed"
     severity = "error" if instance.status == "returned" else ("warning" if instance.status == "cancelled" else "info")
     description = f"Order #{instance.id} {instance.status} - Amount: ₹{instance.amount}"
     
-    log_activity(
-        customer=instance.customer,
-        action=action,
-        severity=severity,
-        description=description,
-        metadata={
-            "order_id": instance.id,
-            "order_status": instance.status,
-            "order_amount": str(instance.amount),
-        }
-    )
+    with span("signal.log_activity"):
+        log_activity(
+            customer=instance.customer,
+            action=action,
+            severity=severity,
+            description=description,
+            metadata={
+                "order_id": instance.id,
+                "order_status": instance.status,
+                "order_amount": str(instance.amount),
+            }
+        )
     
     # Recompute on create or significant updates
+    from .services.credit_scoring import compute_and_persist_credit_profile
     compute_and_persist_credit_profile(instance.customer)
 
 
 @receiver(post_save, sender=Payment)
+@traced("signal.recompute_on_payment")
 def recompute_on_payment(sender, instance: Payment, created: bool, **kwargs):
+    _sync_daily_activity(instance, created)
+
     # Log activity
     action = "payment_success" if instance.success else "payment_failed"
     severity = "error" if not instance.success else "info"
@@ -46,22 +97,44 @@ def recompute_on_payment(sender, instance: Payment, created: bool, **kwargs):
     if instance.order:
         metadata["order_id"] = instance.order.id
     
-    log_activity(
-        customer=instance.customer,
-        action=action,
-        severity=severity,
-        description=description,
-        metadata=metadata,
-    )
+    with span("signal.log_activity"):
+        log_activity(
+            customer=instance.customer,
+            action=action,
+            severity=severity,
+            description=description,
+            metadata=metadata,
+        )
     
+    from .services.credit_scoring import compute_and_persist_credit_profile
     compute_and_persist_credit_profile(instance.customer)
 
 
+@receiver(post_init, sender=CreditProfile)
+def remember_loaded_score(sender, instance: CreditProfile, **kwargs):
+    # Keep the score/band as loaded so post_save can tell whether they moved.
+    # Read __dict__ directly so deferred fields are never fetched here.
+    if instance.pk is None:
+        instance._loaded_score = None
+    else:
+        instance._loaded_score = (instance.__dict__.get("score"), instance.__dict__.get("risk_band"))
+
+
 @receiver(post_save, sender=CreditProfile)
+@traced("signal.log_score_update")
 def log_score_update(sender, instance: CreditProfile, created: bool, **kwargs):
     action = "score_recomputed" if created else "score_updated"
     description = f"Credit score updated: {instance.score} (Risk Band: {instance.risk_band})"
-    
+    previous_score, previous_band = getattr(instance, "_loaded_score", None) or (None, None)
+
+    if created or (instance.score, instance.risk_band) != (previous_score, previous_band):
+        CreditScoreHistory.objects.create(
+            customer_id=instance.customer_id,
+            score=instance.score,
+            risk_band=instance.risk_band,
+        )
+    instance._loaded_score = (instance.score, instance.risk_band)
+
     log_activity(
         customer=instance.customer,
         action=action,
@@ -70,9 +143,65 @@ def log_score_update(sender, instance: CreditProfile, created: bool, **kwargs):
         metadata={
             "score": instance.score,
             "risk_band": instance.risk_band,
-            "previous_score": kwargs.get("previous_score"),
+            "previous_score": previous_score,
         }
     )
 
 
+def _deleting_customer(origin) -> bool:
+    # Cascade from a Customer delete: its buckets and profile go with it
+    return isinstance(origin, Customer) or getattr(origin, "model", None) is Customer
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_from_rollup(sender, instance: Order, origin=None, **kwargs):
+    if not _deleting_customer(origin):
+        daily_activity.record_order_change(getattr(instance, "_rollup_state", None), None)
+
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_from_rollup(sender, instance: Payment, origin=None, **kwargs):
+    if not _deleting_customer(origin):
+        daily_activity.record_payment_change(getattr(instance, "_rollup_state", None), None)
+
 
+def _recompute_if_present(customer_id) -> None:
+    from .services.credit_scoring import compute_and_persist_credit_profile
+
+    customer = Customer.objects.filter(pk=customer_id).first()
+    if customer is not None:
+        compute_and_persist_credit_profile(customer)
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=CreditProfile)
+def recompute_after_delete(sender, instance, origin=None, **kwargs):
+    if _deleting_customer(origin):
+        return
+    customer_id = instance.customer_id
+    change_tracking.mark_dirty([customer_id], "delete")
+    if sender is not CreditProfile:
+        # After commit, so a rolled-back delete doesn't rescore
+        transaction.on_commit(lambda: _recompute_if_present(customer_id))
+
+
+@receiver(post_save, sender=Scorecard)
+@receiver(post_delete, sender=Scorecard)
+def invalidate_active_scorecard(sender, **kwargs):
+    # Clear now and again after commit, so no reader re-caches the old version in between
+    scorecards.invalidate_active()
+    transaction.on_commit(scorecards.invalidate_active)
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=Payment)
+@receiver(post_save, sender=CreditProfile)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=CreditProfile)
+def invalidate_cached_lists(sender, **kwargs):
+    # Bump after commit so a reader can't cache pre-commit data under the new version
+    transaction.on_commit(lambda: bump_version(sender))
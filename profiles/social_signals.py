@@ -1,9 +1,11 @@
 from allauth.account.signals import user_logged_in
-from allauth.socialaccount.signals import social_account_added, pre_social_login
+from allauth.socialaccount.models import SocialApp
+from allauth.socialaccount.signals import pre_social_login
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from django.contrib.sessions.models import Session
 from .utils import log_activity
-from .models import Customer
+from .services import oauth_config
+from .services.customer_accounts import link_customer, remember_customer
 
 
 @receiver(pre_social_login)
@@ -25,15 +27,10 @@ def pre_social_login_handler(sender, request, sociallogin, **kwargs):
 def log_user_login(sender, request, user, **kwargs):
     """Log user login (works for both regular and social login)"""
     try:
-        # Try to find customer by email
-        customer = None
-        if user.email:
-            try:
-                customer = Customer.objects.get(email=user.email)
-            except Customer.DoesNotExist:
-                pass
-        
         login_method = "social" if kwargs.get("sociallogin") else "regular"
+        # Social sign-ups get a customer record on first login
+        customer = link_customer(user, create=login_method == "social")
+        remember_customer(request, customer)
         description = f"User {user.username} logged in via {login_method}"
         
         log_activity(
@@ -49,17 +46,13 @@ def log_user_login(sender, request, user, **kwargs):
             },
             request=request,
         )
-        
-        # Auto-create customer if doesn't exist and user has email
-        if not customer and user.email and login_method == "social":
-            try:
-                customer = Customer.objects.create(
-                    full_name=user.get_full_name() or user.username,
-                    email=user.email,
-                    phone=""
-                )
-            except Exception:
-                pass
     except Exception:
         pass  # Don't break login flow
 
+
+@receiver(post_save, sender=SocialApp)
+@receiver(post_delete, sender=SocialApp)
+@receiver(m2m_changed, sender=SocialApp.sites.through)
+def invalidate_provider_config(sender, **kwargs):
+    """Drop the cached provider state when a SocialApp or its sites change"""
+    oauth_config.invalidate()
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CreditProfileViewSet, CustomerViewSet, OrderViewSet, PaymentViewSet
+from .views import CreditProfileViewSet, CustomerViewSet, MetricsView, OrderViewSet, PaymentViewSet, ScoreSimulationView
 from .permissions import IsAdminOrReadOnly
 
 
@@ -14,6 +14,8 @@ router.register(r"credit-profiles", CreditProfileViewSet, basename="credit-profi
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("score-simulations/", ScoreSimulationView.as_view(), name="score-simulations"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 
@@ -2,20 +2,45 @@ from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .async_api import AsyncActionsMixin
+from .caching import CachedListMixin
+from .conditional import aget_profile_state, is_not_modified, not_modified_response, profile_etag, set_validators
+from .db_retry import RetryWritesMixin, atomic_with_retry
 from .models import CreditProfile, Customer, Order, Payment
+from .routing import ReplicaListMixin
 from .serializers import (
+    CreditProfileLookupSerializer,
     CreditProfileSerializer,
     CustomerSerializer,
     OrderSerializer,
     PaymentSerializer,
+    ScoreHistoryQuerySerializer,
+    ScoreSimulationSerializer,
 )
 from .services.credit_scoring import compute_and_persist_credit_profile
+from .services.metrics import get_counters
+from .services.feature_snapshot import SnapshotError
+from .services.profile_lookup import alookup_credit_profiles
+from .services.score_history import get_score_history
+from .services.score_simulation import simulate_scores
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class SparseFieldsViewMixin:
+    """Narrow list/retrieve querysets to the fields picked by ``?fields=``/``?expand=``."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            queryset = self.get_serializer().narrow_queryset(queryset)
+        return queryset
+
+
+class CustomerViewSet(AsyncActionsMixin, CachedListMixin, ReplicaListMixin, SparseFieldsViewMixin, RetryWritesMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all().order_by("-created_at")
     serializer_class = CustomerSerializer
+    cache_models = (Customer,)
     search_fields = ["full_name", "email", "phone"]
     ordering_fields = ["created_at", "full_name", "email"]
 
@@ -27,21 +52,39 @@ class CustomerViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"], url_path="recompute-score")
     def recompute_score(self, request, pk=None):
         customer = self.get_object()
-        profile = compute_and_persist_credit_profile(customer)
+        profile = atomic_with_retry(compute_and_persist_credit_profile)(customer)
         return Response(CreditProfileSerializer(profile).data)
 
     @action(detail=True, methods=["get"], url_path="credit-profile")
-    def credit_profile(self, request, pk=None):
-        customer = self.get_object()
-        profile = getattr(customer, "credit_profile", None)
+    async def credit_profile(self, request, pk=None):
+        # Answer revalidating pollers before loading the customer or serializing
+        state = await aget_profile_state(customer_id=pk)
+        if state:
+            etag = profile_etag(request, *state)
+            if is_not_modified(request, etag, state[1]):
+                return not_modified_response(etag, state[1])
+
+        customer = await self.aget_object()
+        profile = await CreditProfile.objects.filter(customer=customer).afirst()
         if not profile:
             return Response({"detail": "No profile yet"}, status=status.HTTP_404_NOT_FOUND)
-        return Response(CreditProfileSerializer(profile).data)
+        profile.customer = customer
+        response = Response(CreditProfileSerializer(profile, context=self.get_serializer_context()).data)
+        return set_validators(response, profile_etag(request, profile.id, profile.updated_at), profile.updated_at)
+
+    @action(detail=True, methods=["get"], url_path="score-history")
+    def score_history(self, request, pk=None):
+        customer = self.get_object()
+        query = ScoreHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(get_score_history(customer.pk, **query.validated_data))
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(CachedListMixin, ReplicaListMixin, SparseFieldsViewMixin, RetryWritesMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all().order_by("-created_at")
     serializer_class = OrderSerializer
+    # ?expand= embeds the related rows, so their saves invalidate too
+    cache_models = (Order, Customer)
     filterset_fields = ["status", "customer"]
     ordering_fields = ["created_at", "amount"]
 
@@ -51,9 +94,10 @@ class OrderViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(CachedListMixin, ReplicaListMixin, SparseFieldsViewMixin, RetryWritesMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all().order_by("-created_at")
     serializer_class = PaymentSerializer
+    cache_models = (Payment, Customer, Order)
     filterset_fields = ["method", "success", "customer", "order"]
     ordering_fields = ["created_at", "amount"]
 
@@ -63,9 +107,10 @@ class PaymentViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
 
-class CreditProfileViewSet(viewsets.ReadOnlyModelViewSet):
+class CreditProfileViewSet(AsyncActionsMixin, CachedListMixin, ReplicaListMixin, SparseFieldsViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = CreditProfile.objects.select_related("customer").all().order_by("-updated_at")
     serializer_class = CreditProfileSerializer
+    cache_models = (CreditProfile, Customer)
     filterset_fields = ["risk_band"]
     search_fields = ["customer__full_name", "customer__email"]
     ordering_fields = ["updated_at", "score"]
@@ -73,4 +118,60 @@ class CreditProfileViewSet(viewsets.ReadOnlyModelViewSet):
     def get_permissions(self):
         return [permissions.IsAuthenticated()]
 
-
+    async def retrieve(self, request, *args, **kwargs):
+        state = await aget_profile_state(pk=kwargs["pk"])
+        if state:
+            etag = profile_etag(request, *state)
+            if is_not_modified(request, etag, state[1]):
+                return not_modified_response(etag, state[1])
+
+        profile = await self.aget_object()
+        response = Response(self.get_serializer(profile).data)
+        # updated_at may be deferred by ?fields=, so reuse the state read above
+        return set_validators(response, profile_etag(request, *state), state[1])
+
+    @action(detail=False, methods=["post"], url_path="lookup")
+    async def lookup(self, request):
+        query = CreditProfileLookupSerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+        results = await alookup_credit_profiles(
+            query.validated_data["customers"],
+            include_features=query.validated_data["include_features"],
+        )
+        found = sum(1 for entry in results if entry["found"])
+        return Response({"found": found, "not_found": len(results) - found, "results": results})
+
+
+class ScoreSimulationView(APIView):
+    """What-if scores for feature overrides and/or a candidate scorecard; nothing is saved."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        query = ScoreSimulationSerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+        options = query.validated_data
+        try:
+            result = simulate_scores(
+                customers=options.get("customers"),
+                overrides=options.get("overrides"),
+                scorecard=options.get("scorecard"),
+                limit=options["limit"],
+                source=options["source"],
+            )
+        except SnapshotError as exc:
+            return Response({"source": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        except OverflowError:
+            # Stored features combined with the given values can still exceed what a score holds
+            return Response(
+                {"non_field_errors": ["Simulated scores are out of range; use smaller overrides or coefficients"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result)
+
+
+class MetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_counters())
@@ -1,16 +1,21 @@
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.http import HttpRequest, HttpResponse
+from django.core.exceptions import ValidationError
 from django.shortcuts import render
 from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 
 from .models import ActivityLog, Customer
+from .routing import use_replica
 
 
 @login_required
 @user_passes_test(lambda u: u.is_staff)
-def audit_logs_page(request: HttpRequest) -> HttpResponse:
+@use_replica
+async def audit_logs_page(request: HttpRequest) -> HttpResponse:
+    # Resolve the user once here; templates read request.user synchronously
+    request.user = await request.auser()
     logs = ActivityLog.objects.select_related("customer").all()
     
     # Filters
@@ -23,9 +28,9 @@ def audit_logs_page(request: HttpRequest) -> HttpResponse:
     
     if customer_id:
         try:
-            customer = Customer.objects.get(id=customer_id)
+            customer = await Customer.objects.aget(id=customer_id)
             logs = logs.filter(customer=customer)
-        except Customer.DoesNotExist:
+        except (Customer.DoesNotExist, ValueError, ValidationError):
             pass
     
     if action_filter:
@@ -56,16 +61,19 @@ def audit_logs_page(request: HttpRequest) -> HttpResponse:
             Q(customer__email__icontains=search)
         )
     
-    # Pagination
+    # Statistics
+    total_logs = await logs.acount()
+    error_count = await logs.filter(severity__in=["error", "critical"]).acount()
+    today_count = await logs.filter(created_at__gte=timezone.now().replace(hour=0, minute=0, second=0)).acount()
+
+    # Pagination: reuse the total instead of a second COUNT, and load the
+    # page here since rendering must not query from the event loop
     from django.core.paginator import Paginator
     paginator = Paginator(logs, 50)
+    paginator.count = total_logs
     page_number = request.GET.get("page", 1)
     page_obj = paginator.get_page(page_number)
-    
-    # Statistics
-    total_logs = logs.count()
-    error_count = logs.filter(severity__in=["error", "critical"]).count()
-    today_count = logs.filter(created_at__gte=timezone.now().replace(hour=0, minute=0, second=0)).count()
+    page_obj.object_list = [log async for log in page_obj.object_list]
     
     context = {
         "logs": page_obj,
@@ -74,7 +82,7 @@ def audit_logs_page(request: HttpRequest) -> HttpResponse:
         "today_count": today_count,
         "action_choices": ActivityLog.ACTION_CHOICES,
         "severity_choices": ActivityLog.SEVERITY_CHOICES,
-        "customers": Customer.objects.all().order_by("-created_at")[:100],
+        "customers": [c async for c in Customer.objects.all().order_by("-created_at")[:100]],
         "filters": {
             "customer": customer_id,
             "action": action_filter,
@@ -1,22 +1,20 @@
 from django.contrib.auth.views import LoginView
 from django.shortcuts import redirect
 
+from .services.oauth_config import google_enabled
+
 
 class CustomLoginView(LoginView):
     def get_success_url(self):
         # Log login activity
         try:
             from .utils import log_activity
-            from .models import Customer
+            from .services.customer_accounts import link_customer, remember_customer
             
             user = self.request.user
-            # Try to find customer by email
-            customer = None
-            if user.email:
-                try:
-                    customer = Customer.objects.get(email=user.email)
-                except Customer.DoesNotExist:
-                    pass
+            # Customers get their record at login rather than on first dashboard view
+            customer = link_customer(user, create=not user.is_staff)
+            remember_customer(self.request, customer)
             
             log_activity(
                 customer=customer,
@@ -41,49 +39,5 @@ class CustomLoginView(LoginView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        google_enabled = False
-        try:
-            from django.conf import settings
-            from pathlib import Path
-            from dotenv import load_dotenv
-            import os
-            
-            # Load .env to check for Google OAuth credentials
-            env_path = settings.BASE_DIR / ".env"
-            load_dotenv(env_path, override=True)
-            
-            client_id = os.environ.get("GOOGLE_CLIENT_ID")
-            secret = os.environ.get("GOOGLE_CLIENT_SECRET")
-            
-            if client_id and secret:
-                from allauth.socialaccount.models import SocialApp
-                from django.contrib.sites.models import Site
-                # Try to get or create SocialApp
-                site = Site.objects.get_current(self.request)
-                app, created = SocialApp.objects.get_or_create(
-                    provider="google",
-                    defaults={
-                        "name": "Google",
-                        "client_id": client_id,
-                        "secret": secret,
-                    }
-                )
-                
-                # Update if credentials changed
-                if not created:
-                    if app.client_id != client_id or app.secret != secret:
-                        app.client_id = client_id
-                        app.secret = secret
-                        app.save()
-                
-                # Link to site if not linked
-                if site not in app.sites.all():
-                    app.sites.add(site)
-                
-                google_enabled = app.client_id and app.secret and (site in app.sites.all())
-        except Exception:
-            pass
-        
-        context["google_enabled"] = google_enabled
+        context["google_enabled"] = google_enabled()
         return context
-
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import User
@@ -7,8 +8,12 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
 from .models import CreditProfile, Customer, Order, Payment
+from .db_retry import atomic_with_retry
 from .forms import OrderForm, PaymentForm
+from .routing import use_replica
 from .services.credit_scoring import compute_and_persist_credit_profile
+from .services.customer_accounts import aget_request_customer, aremember_customer, link_customer
+from .services.oauth_config import google_enabled
 
 
 def home_page(request: HttpRequest) -> HttpResponse:
@@ -79,7 +84,8 @@ def order_create_page(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         form = OrderForm(request.POST)
         if form.is_valid():
-            order = form.save()
+            # Insert plus signal handlers commit together
+            order = atomic_with_retry(form.save)()
             # Recompute score
             compute_and_persist_credit_profile(order.customer)
             # Log activity
@@ -117,7 +123,7 @@ def payment_create_page(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         form = PaymentForm(request.POST)
         if form.is_valid():
-            payment = form.save()
+            payment = atomic_with_retry(form.save)()
             # Recompute score
             compute_and_persist_credit_profile(payment.customer)
             # Log activity
@@ -136,44 +142,52 @@ def payment_create_page(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
-def customer_dashboard_page(request: HttpRequest) -> HttpResponse:
+async def customer_dashboard_page(request: HttpRequest) -> HttpResponse:
     """Customer-facing dashboard showing their own credit profile and transactions"""
-    user = request.user
-    customer = None
-    
-    # Find customer by email
-    if user.email:
-        try:
-            customer = Customer.objects.get(email=user.email)
-        except Customer.DoesNotExist:
-            pass
-    
-    if not customer:
-        # Create customer if doesn't exist
-        if user.email:
-            customer = Customer.objects.create(
-                full_name=user.get_full_name() or user.username,
-                email=user.email,
-                phone=""
-            )
+    # Resolve the user once here; templates read request.user synchronously
+    request.user = await request.auser()
+    # Customer and credit profile arrive in one joined query
+    customer = await aget_request_customer(request)
+    if customer is None:
+        # Accounts created before the user link existed are claimed by email
+        customer = await sync_to_async(link_customer)(request.user)
+        if customer is not None:
+            customer = await Customer.objects.select_related("credit_profile").aget(pk=customer.pk)
+        await aremember_customer(request, customer)
+    if customer is None:
+        if request.user.email:
+            error = "No customer record is linked to your account yet. Please sign in again or contact support."
         else:
-            return render(request, "profiles/customer_dashboard.html", {
-                "customer": None,
-                "profile": None,
-                "error": "Please update your email in your profile to view your credit information."
-            })
+            error = "Please update your email in your profile to view your credit information."
+        return render(request, "profiles/customer_dashboard.html", {
+            "customer": None,
+            "profile": None,
+            "error": error,
+        })
     
     profile = getattr(customer, "credit_profile", None)
-    orders = customer.orders.order_by("-created_at")[:10]
-    payments = customer.payments.order_by("-created_at")[:10]
+    # Materialized here: rendering must not query from the event loop
+    orders = [order async for order in customer.orders.order_by("-created_at")[:10]]
+    payments = [payment async for payment in customer.payments.order_by("-created_at")[:10]]
     
     # Calculate stats
-    total_orders = customer.orders.count()
-    delivered_orders = customer.orders.filter(status="delivered").count()
-    returned_orders = customer.orders.filter(status="returned").count()
-    total_spend = customer.orders.filter(status="delivered").aggregate(s=models.Sum("amount"))['s'] or 0
-    successful_payments = customer.payments.filter(success=True).count()
-    total_payments = customer.payments.count()
+    delivered = models.Q(status="delivered")
+    order_stats = await customer.orders.aaggregate(
+        total_orders=models.Count("id"),
+        delivered_orders=models.Count("id", filter=delivered),
+        returned_orders=models.Count("id", filter=models.Q(status="returned")),
+        total_spend=models.Sum("amount", filter=delivered),
+    )
+    payment_stats = await customer.payments.aaggregate(
+        successful_payments=models.Count("id", filter=models.Q(success=True)),
+        total_payments=models.Count("id"),
+    )
+    total_orders = order_stats["total_orders"]
+    delivered_orders = order_stats["delivered_orders"]
+    returned_orders = order_stats["returned_orders"]
+    total_spend = order_stats["total_spend"] or 0
+    successful_payments = payment_stats["successful_payments"]
+    total_payments = payment_stats["total_payments"]
     
     # Calculate percentages
     return_rate_pct = round((returned_orders / delivered_orders * 100) if delivered_orders else 0, 1)
@@ -197,10 +211,12 @@ def customer_dashboard_page(request: HttpRequest) -> HttpResponse:
 
 @login_required
 @user_passes_test(lambda u: u.is_staff)
+@use_replica
 def dashboard_page(request: HttpRequest) -> HttpResponse:
     """Admin/Staff dashboard - full system overview"""
     from django.db.models import Sum, Count, Avg, Q
-    from datetime import datetime, timedelta
+    from django.utils import timezone
+    from datetime import timedelta
     
     profiles = CreditProfile.objects.select_related("customer")
     customers = Customer.objects.all()
@@ -240,7 +256,7 @@ def dashboard_page(request: HttpRequest) -> HttpResponse:
     cod_pct = round((cod_count / total_payments * 100) if total_payments else 0, 2)
     
     # Recent activity (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
+    thirty_days_ago = timezone.now() - timedelta(days=30)
     recent_orders = orders.filter(created_at__gte=thirty_days_ago).count()
     recent_customers = customers.filter(created_at__gte=thirty_days_ago).count()
     
@@ -299,6 +315,7 @@ def dashboard_page(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
+@use_replica
 def export_credit_report_pdf(request: HttpRequest, customer_id) -> HttpResponse:
     from .utils import log_activity
     
@@ -332,6 +349,7 @@ def export_credit_report_pdf(request: HttpRequest, customer_id) -> HttpResponse:
 
 
 @login_required
+@use_replica
 def customer_history_page(request: HttpRequest, customer_id) -> HttpResponse:
     customer = get_object_or_404(Customer, id=customer_id)
     orders = list(customer.orders.all().values("id", "status", "amount", "created_at"))
@@ -404,14 +422,6 @@ def profile_page(request: HttpRequest) -> HttpResponse:
     return render(request, "profiles/profile.html", {"user_obj": user})
 
 
-def _create_customer_for_user(user: User) -> None:
-    # Create Customer record if not exists, keyed by email when possible
-    if not user.email:
-        return
-    if not Customer.objects.filter(email=user.email).exists():
-        Customer.objects.create(full_name=user.get_full_name() or user.username, email=user.email, phone="")
-
-
 def register_page(request: HttpRequest) -> HttpResponse:
     if request.user.is_authenticated:
         return redirect("dashboard")
@@ -437,7 +447,7 @@ def register_page(request: HttpRequest) -> HttpResponse:
                 user.first_name = first
                 user.last_name = " ".join(rest)
                 user.save()
-            _create_customer_for_user(user)
+            link_customer(user, create=True)
             auth_user = authenticate(request, username=username, password=password)
             if auth_user:
                 login(request, auth_user)
@@ -446,49 +456,5 @@ def register_page(request: HttpRequest) -> HttpResponse:
                 else:
                     return redirect("customer-dashboard")
     
-    # Check if Google OAuth is enabled (auto-setup if .env has credentials)
-    google_enabled = False
-    try:
-        from django.conf import settings
-        from pathlib import Path
-        from dotenv import load_dotenv
-        import os
-        from allauth.socialaccount.models import SocialApp
-        from django.contrib.sites.models import Site
-        
-        # Load .env to check for Google OAuth credentials
-        env_path = settings.BASE_DIR / ".env"
-        load_dotenv(env_path, override=True)
-        
-        client_id = os.environ.get("GOOGLE_CLIENT_ID")
-        secret = os.environ.get("GOOGLE_CLIENT_SECRET")
-        
-        if client_id and secret:
-            # Try to get or create SocialApp
-            site = Site.objects.get_current(request)
-            app, created = SocialApp.objects.get_or_create(
-                provider="google",
-                defaults={
-                    "name": "Google",
-                    "client_id": client_id,
-                    "secret": secret,
-                }
-            )
-            
-            # Update if credentials changed
-            if not created:
-                if app.client_id != client_id or app.secret != secret:
-                    app.client_id = client_id
-                    app.secret = secret
-                    app.save()
-            
-            # Link to site if not linked
-            if site not in app.sites.all():
-                app.sites.add(site)
-            
-            google_enabled = app.client_id and app.secret and (site in app.sites.all())
-    except Exception:
-        pass
-    
-    return render(request, "registration/register.html", {"error": error, "google_enabled": google_enabled})
+    return render(request, "registration/register.html", {"error": error, "google_enabled": google_enabled()})
 